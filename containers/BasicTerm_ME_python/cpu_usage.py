@@ -0,0 +1,23 @@
+import os
+import time
+
+
+def available_cores():
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+
+
+class CpuTimer:
+    """Wall time and process CPU time of a block, summed over all threads."""
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall = time.perf_counter() - self.wall
+        self.cpu = time.process_time() - self.cpu
+
+    def report(self):
+        cores = available_cores()
+        print(f"cpu_time_in_seconds={self.cpu}")
+        print(f"cpu_utilization={self.cpu / self.wall / cores:.1%} of {cores} cores")
@@ -0,0 +1,37 @@
+# Copy of github-runners-benchmarks/Python/curves.py, this directory is a separate Docker build context.
+import hashlib
+import numpy as np
+
+_curves = {}
+
+
+class Curve:
+    """Time-only vectors of a discount curve and an inflation rate, by projection month ``t``.
+
+    ``disc_rate_ann`` holds annual spot rates by projection year, held flat
+    beyond the last year. The arrays are read-only as curves are shared
+    between models.
+    """
+    def __init__(self, disc_rate_ann, inflation_rate, proj_len):
+        t = np.arange(proj_len)
+        self.duration = t // 12
+        rate = disc_rate_ann[np.minimum(self.duration, len(disc_rate_ann) - 1)]
+        self.disc_rate_mth = (1 + rate) ** (1/12) - 1
+        self.discount = (1 + rate) ** (-t / 12) # spot discount factor of month t
+        self.accumulated_discount = np.concatenate([[1], np.cumprod((1 + rate[:-1]) ** (-1/12))]) # monthly forward rates
+        self.inflation_factor = (1 + inflation_rate) ** (t / 12)
+        for values in vars(self).values():
+            values.setflags(write=False)
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in vars(self).values())
+
+
+def curve(disc_rate_ann, inflation_rate, proj_len):
+    """The ``Curve`` of ``proj_len`` months, computed once per distinct rates and length."""
+    rates = np.ascontiguousarray(disc_rate_ann, dtype=np.float64)
+    key = (hashlib.sha1(rates.tobytes()).hexdigest(), float(inflation_rate), int(proj_len))
+    if key not in _curves:
+        _curves[key] = Curve(rates, float(inflation_rate), int(proj_len))
+    return _curves[key]
@@ -1,22 +1,72 @@
 import argparse
+import os
+from functools import partial
+from replication import MODES
+
+MODELS = ["torch_recursive", "jax_iterative", "numpy_iterative"]
+
+def parse_cpus(spec: str):
+    """CPU ids of a list such as ``0-3,8``."""
+    cpus = set()
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+def positive_int(value: str):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+def configure_cpu(device: str, threads: int, cpus: set):
+    """Pin the process and set thread counts and devices before any backend is imported."""
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    if device == "cpu":
+        os.environ["JAX_PLATFORMS"] = "cpu"
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    elif device == "gpu":
+        os.environ["JAX_PLATFORMS"] = "cuda"
+    if threads:
+        for name in ["OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"]:
+            os.environ[name] = str(threads)
+        if threads == 1: # XLA has no flag for other thread counts, pin with --cpus instead
+            os.environ["XLA_FLAGS"] = f"{os.environ.get('XLA_FLAGS', '')} --xla_cpu_multi_thread_eigen=false".strip()
 
 def main():
     parser = argparse.ArgumentParser(description="Term ME model runner")
-    parser.add_argument("--multiplier", type=int, default=100, help="Multiplier for model points")
-    # add an argument that must be either "torch_recursive" or "jax_iterative"
-    parser.add_argument("--model", type=str, default="jax_iterative", choices=["torch_recursive", "jax_iterative"], help="Model to run")
+    parser.add_argument("--multiplier", type=positive_int, nargs="+", default=[100], help="Multipliers for model points, run in turn")
+    parser.add_argument("--model", type=str, default="jax_iterative", choices=MODELS, help="Model to run")
+    parser.add_argument("--device", type=str, default="auto", choices=["auto", "cpu", "gpu"], help="Device, auto uses a GPU when one is found")
+    parser.add_argument("--threads", type=positive_int, default=None, help="Intra-op threads of PyTorch and BLAS, 1 also makes XLA single-threaded")
+    parser.add_argument("--cpus", type=parse_cpus, default=None, help="CPU ids to pin the process to, e.g. 0-3,8")
+    parser.add_argument("--replication", type=str, default="tile", choices=MODES, help="How multiplied model points are valued: tile copies them, scale multiplies the base result, stream runs blocks of copies")
+    parser.add_argument("--block", type=positive_int, default=10, help="Copies per block with --replication stream")
     args = parser.parse_args()
+    if args.model == "numpy_iterative" and args.device == "gpu":
+        parser.error("numpy_iterative only runs on the CPU")
 
-    multiplier = args.multiplier
+    configure_cpu(args.device, args.threads, args.cpus)
 
     if args.model == "torch_recursive":
         from term_me_recursive_pytorch import time_recursive_PyTorch # having both imports at top level gave a jax error?
-        time_recursive_PyTorch(multiplier)
+        import torch
+        if args.threads:
+            torch.set_num_threads(args.threads)
+        device = {"auto": "auto", "cpu": "cpu", "gpu": "cuda"}[args.device]
+        time_model = partial(time_recursive_PyTorch, device=device)
     elif args.model == "jax_iterative":
         from term_me_iterative_jax import time_iterative_jax
-        time_iterative_jax(multiplier) 
+        time_model = time_iterative_jax
+    elif args.model == "numpy_iterative":
+        from term_me_iterative_numpy import time_iterative_numpy
+        time_model = time_iterative_numpy
     else:
         raise ValueError("Invalid model")
 
+    for multiplier in args.multiplier:
+        time_model(multiplier, replication=args.replication, block=args.block)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,39 @@
+from cpu_usage import CpuTimer
+
+MODES = ["tile", "scale", "stream"]
+
+def plan(copies: int, mode: str = "tile", block: int = 1):
+    """Blocks ``(replicas, runs, weight)`` that value ``copies`` replicas of the base model points.
+
+    ``tile`` materialises every replica and runs once. The replicas are
+    identical, so ``scale`` runs the base model points once and multiplies the
+    result by ``copies``. ``stream`` runs blocks of ``block`` replicas until all
+    copies are valued, so memory is bounded by the block size.
+    """
+    if copies < 1 or block < 1:
+        raise ValueError(f"copies and block must be positive, got {copies} and {block}")
+    if mode == "tile":
+        return [(copies, 1, 1)]
+    if mode == "scale":
+        return [(1, 1, copies)]
+    if mode == "stream":
+        full, rest = divmod(copies, block)
+        return [(replicas, runs, 1) for replicas, runs in [(block, full), (rest, 1)] if replicas and runs]
+    raise ValueError(f"invalid replication mode {mode!r}")
+
+def run_replicated(build, run, copies: int, mode: str = "tile", block: int = 1):
+    """Total of ``run`` over ``copies`` replicas of the base model points.
+
+    ``build(replicas)`` returns the inputs of ``replicas`` tiled copies, built
+    once per distinct block. Every block is run once untimed to warm up.
+    Returns the total and the ``CpuTimer`` of the timed runs.
+    """
+    blocks = [(build(replicas), runs, weight) for replicas, runs, weight in plan(copies, mode, block)]
+    for inputs, _, _ in blocks:
+        run(inputs)
+    total = 0.
+    with CpuTimer() as timer:
+        for inputs, runs, weight in blocks:
+            for _ in range(runs):
+                total += weight * run(inputs)
+    return total, timer
@@ -1,15 +1,30 @@
 import jax
+import os
 import pandas as pd
 import numpy as np
 import timeit
+from replication import run_replicated
 import jax.numpy as jnp
 import equinox as eqx
+from xlsx_cache import read_excel
 jax.config.update("jax_enable_x64", True)
+# keep compiled executables on disk, so later processes skip compilation
+jax.config.update("jax_compilation_cache_dir", os.environ.get("JAX_CACHE_DIR", "_jax_cache"))
+jax.config.update("jax_persistent_cache_min_compile_time_secs", 0)
 
-disc_rate_ann = pd.read_excel("BasicTerm_ME/disc_rate_ann.xlsx", index_col=0)
-mort_table = pd.read_excel("BasicTerm_ME/mort_table.xlsx", index_col=0)
-model_point_table = pd.read_excel("BasicTerm_ME/model_point_table.xlsx", index_col=0)
-premium_table = pd.read_excel("BasicTerm_ME/premium_table.xlsx", index_col=[0,1])
+MIN_BUCKET = 1 << 14
+
+def bucket_size(n: int):
+    """Padded model-point count: the next power of two, at least ``MIN_BUCKET``."""
+    return max(MIN_BUCKET, 1 << (n - 1).bit_length())
+
+def pad(values, size, **kwargs):
+    return np.pad(values, (0, size - len(values)), **kwargs)
+
+disc_rate_ann = read_excel("BasicTerm_ME/disc_rate_ann.xlsx", index_col=0)
+mort_table = read_excel("BasicTerm_ME/mort_table.xlsx", index_col=0)
+model_point_table = read_excel("BasicTerm_ME/model_point_table.xlsx", index_col=0)
+premium_table = read_excel("BasicTerm_ME/premium_table.xlsx", index_col=[0,1])
 
 class ModelPointsEqx(eqx.Module):
     premium_pp: jnp.ndarray
@@ -18,18 +33,25 @@ class ModelPointsEqx(eqx.Module):
     sum_assured: jnp.ndarray
     policy_count: jnp.ndarray
     policy_term: jnp.ndarray
-    max_proj_len: jnp.ndarray
+    max_proj_len: int = eqx.field(static=True)
 
     def __init__(self, model_point_table: pd.DataFrame, premium_table: pd.DataFrame, size_multiplier: int = 1):
+        """Model points tiled ``size_multiplier`` times, padded to ``bucket_size``.
+
+        Padded rows repeat the last model point with no policies, so every
+        cash flow of them is zero and counts in a bucket share one executable.
+        """
         table = model_point_table.merge(premium_table, left_on=["age_at_entry", "policy_term"], right_index=True)
         table.sort_values(by="policy_id", inplace=True)
-        self.premium_pp = jnp.round(jnp.array(np.tile(table["sum_assured"].to_numpy() * table["premium_rate"].to_numpy(), size_multiplier)),decimals=2)
-        self.duration_mth = jnp.array(jnp.tile(table["duration_mth"].to_numpy(), size_multiplier))
-        self.age_at_entry = jnp.array(jnp.tile(table["age_at_entry"].to_numpy(), size_multiplier))
-        self.sum_assured = jnp.array(jnp.tile(table["sum_assured"].to_numpy(), size_multiplier))
-        self.policy_count = jnp.array(jnp.tile(table["policy_count"].to_numpy(), size_multiplier))
-        self.policy_term = jnp.array(jnp.tile(table["policy_term"].to_numpy(), size_multiplier))
-        self.max_proj_len = jnp.max(12 * self.policy_term - self.duration_mth) + 1
+        padded = bucket_size(len(table) * size_multiplier)
+        column = lambda values: pad(np.tile(values, size_multiplier), padded, mode="edge")
+        self.premium_pp = jnp.round(jnp.array(column(table["sum_assured"].to_numpy() * table["premium_rate"].to_numpy())),decimals=2)
+        self.duration_mth = jnp.array(column(table["duration_mth"].to_numpy()))
+        self.age_at_entry = jnp.array(column(table["age_at_entry"].to_numpy()))
+        self.sum_assured = jnp.array(column(table["sum_assured"].to_numpy()))
+        self.policy_count = jnp.array(pad(np.tile(table["policy_count"].to_numpy(), size_multiplier), padded))
+        self.policy_term = jnp.array(column(table["policy_term"].to_numpy()))
+        self.max_proj_len = int(np.max(12 * table["policy_term"].to_numpy() - table["duration_mth"].to_numpy()) + 1)
 
 class AssumptionsEqx(eqx.Module):
     disc_rate_ann: jnp.ndarray
@@ -77,7 +99,7 @@ class TermME(eqx.Module):
             pols_if_at_BEF_NB = pols_if_at_BEF_MAT - pols_maturity
             pols_new_biz = jnp.where(duration_month_t == 0, self.mp.policy_count, 0)
             pols_if_at_BEF_DECR = pols_if_at_BEF_NB + pols_new_biz
-            mort_rate = self.assume.mort_table[age_t-18, jnp.clip(duration_t, a_max=5)]
+            mort_rate = self.assume.mort_table[age_t-18, jnp.clip(duration_t, None, 5)]
             mort_rate_mth = 1 - (1 - mort_rate) ** (1/12)
             pols_death = pols_if_at_BEF_DECR * mort_rate_mth
             claims = self.mp.sum_assured * pols_death
@@ -86,7 +108,7 @@ class TermME(eqx.Module):
             discount = (1 + self.assume.disc_rate_ann[ls.t//12]) ** (-ls.t/12)
             inflation_factor = (1 + 0.01) ** (ls.t/12)
             expenses = self.assume.expense_acq * pols_new_biz + pols_if_at_BEF_DECR * self.assume.expense_maint/12 * inflation_factor
-            lapse_rate = jnp.clip(0.1 - 0.02 * duration_t, a_min=0.02)
+            lapse_rate = jnp.clip(0.1 - 0.02 * duration_t, 0.02)
             net_cf = premiums - claims - expenses - commissions
             discounted_net_cf = jnp.sum(net_cf) * discount
             nxt_ls = LoopState(
@@ -97,7 +119,7 @@ class TermME(eqx.Module):
                 pols_if_at_BEF_DECR_prev=pols_if_at_BEF_DECR
             )
             return nxt_ls, None
-        return jax.lax.scan(iterative_core, self.init_ls, xs=None, length=277)[0].tot
+        return jax.lax.scan(iterative_core, self.init_ls, xs=None, length=self.mp.max_proj_len)[0].tot
 
 
 def run_jax_term_ME(term_me: TermME):
@@ -105,23 +127,47 @@ def run_jax_term_ME(term_me: TermME):
 
 run_jax_term_ME_opt = jax.jit(run_jax_term_ME)
 
-def time_jax_func(mp, assume, func):
-    term_me = TermME(mp, assume)
-    result = func(term_me).block_until_ready()
+_executables = {}
+
+def compiled(func, term_me: TermME):
+    """Executable of ``func`` for the shapes of ``term_me``, and the seconds spent compiling it.
+
+    Executables are kept per padded shape and projection length; a compile
+    that hits the on-disk cache only loads the executable.
+    """
+    key = (func, len(term_me.mp.duration_mth), term_me.mp.max_proj_len)
+    if key in _executables:
+        return _executables[key], 0.
     start = timeit.default_timer()
-    result = func(term_me).block_until_ready()
-    end = timeit.default_timer()
-    elapsed_time = end - start  # Time in seconds
-    return float(result), elapsed_time
+    _executables[key] = func.lower(term_me).compile()
+    return _executables[key], timeit.default_timer() - start
+
+def time_jax_func(assume, func, multiplier, replication="tile", block=1):
+    """Total, timer of the runs, and compile seconds of the executables they need."""
+    compile_time = 0.
+    def build(replicas):
+        nonlocal compile_time
+        term_me = TermME(ModelPointsEqx(model_point_table, premium_table, size_multiplier=replicas), assume)
+        compile_time += compiled(func, term_me)[1]
+        return term_me
+    result, timer = run_replicated(
+        build,
+        lambda term_me: float(compiled(func, term_me)[0](term_me).block_until_ready()),
+        multiplier, replication, block,
+    )
+    return result, timer, compile_time
 
-def time_iterative_jax(multiplier: int):
-    mp = ModelPointsEqx(model_point_table, premium_table, size_multiplier=multiplier)
+def time_iterative_jax(multiplier: int, replication: str = "tile", block: int = 1):
     assume = AssumptionsEqx(disc_rate_ann, mort_table)
-    result, time_in_seconds = time_jax_func(mp, assume, run_jax_term_ME_opt)
+    result, timer, compile_time_in_seconds = time_jax_func(assume, run_jax_term_ME_opt, multiplier, replication, block)
+    time_in_seconds = timer.wall
     print("JAX iterative model")
-    print(f"number modelpoints={len(mp.duration_mth):,}")
+    print(f"device={jax.devices()[0]}")
+    print(f"number modelpoints={len(model_point_table) * multiplier:,} ({replication})")
     print(f"{result=:,}")
+    print(f"{compile_time_in_seconds=}")
     print(f"{time_in_seconds=}")
+    timer.report()
 
 if __name__ == "__main__":
     time_iterative_jax(100)
\ No newline at end of file
@@ -4,17 +4,19 @@ import pandas as pd
 import numpy as np
 import torch
 from heavylight import LightModel, agg
-import timeit
+from curves import curve as make_curve
+from replication import run_replicated
+from xlsx_cache import read_excel
 
 print(f"{torch.cuda.is_available()=}")
 # set 64 bit precision
 torch.set_default_dtype(torch.float64)
 print(f"{torch.get_default_dtype()=}")
 
-disc_rate_ann = pd.read_excel("BasicTerm_ME/disc_rate_ann.xlsx", index_col=0)
-mort_table = pd.read_excel("BasicTerm_ME/mort_table.xlsx", index_col=0)
-model_point_table = pd.read_excel("BasicTerm_ME/model_point_table.xlsx", index_col=0)
-premium_table = pd.read_excel("BasicTerm_ME/premium_table.xlsx", index_col=[0,1])
+disc_rate_ann = read_excel("BasicTerm_ME/disc_rate_ann.xlsx", index_col=0)
+mort_table = read_excel("BasicTerm_ME/mort_table.xlsx", index_col=0)
+model_point_table = read_excel("BasicTerm_ME/model_point_table.xlsx", index_col=0)
+premium_table = read_excel("BasicTerm_ME/premium_table.xlsx", index_col=[0,1])
 
 class ModelPoints:
     def __init__(self, model_point_table: pd.DataFrame, premium_table: pd.DataFrame, size_multiplier: int = 1):
@@ -56,14 +58,17 @@ class TermME(LightModel):
     def commissions(self, t):
         return (self.duration(t) == 0) * self.premiums(t)
 
+    def curve(self):
+        return make_curve(self.assume.disc_rate_ann.cpu().numpy(), self.inflation_rate(), self.mp.max_proj_len)
+
     def disc_factors(self):
-        return torch.tensor(list((1 + self.disc_rate_mth()[t])**(-t) for t in range(self.mp.max_proj_len)))
+        return torch.tensor(self.curve().discount, device=self.assume.disc_rate_ann.device)
 
     def discount(self, t: int):
         return (1 + self.assume.disc_rate_ann[t//12]) ** (-t/12)
 
     def disc_rate_mth(self):
-        return torch.tensor(list((1 + self.assume.disc_rate_ann[t//12])**(1/12) - 1 for t in range(self.mp.max_proj_len)))
+        return torch.tensor(self.curve().disc_rate_mth, device=self.assume.disc_rate_ann.device)
 
     def duration(self, t):
         return self.duration_mth(t) // 12
@@ -85,7 +90,7 @@ class TermME(LightModel):
             + self.pols_if_at(t, "BEF_DECR") * self.expense_maint()/12 * self.inflation_factor(t)
 
     def inflation_factor(self, t):
-        return (1 + self.inflation_rate())**(t/12)
+        return self.curve().inflation_factor[t]
 
     def inflation_rate(self):
         return 0.01
@@ -148,45 +153,32 @@ def run_recursive_model(model: TermME):
     return float(sum(model.cache_agg['discounted_net_cf'].values()))
 
 
-def time_recursive_GPU(model: TermME):
-    model.OptimizeMemoryAndReset()
-    start = torch.cuda.Event(enable_timing=True)
-    end = torch.cuda.Event(enable_timing=True)
-    start.record()
-    result = run_recursive_model(model)
-    end.record()
-    torch.cuda.synchronize()
-    return result, start.elapsed_time(end) / 1000
-
-def time_recursive_CPU(model: TermME):
+def run_model_points(model: TermME, mp: ModelPoints):
+    model.mp = mp
     model.OptimizeMemoryAndReset()
-    start = timeit.default_timer()
-    result = run_recursive_model(model)
-    end = timeit.default_timer()
-    return result, end - start
-
-def time_recursive_PyTorch(multiplier: int):
-    if torch.cuda.is_available():
-        device = torch.device('cuda')
-    else:
-        device = torch.device('cpu')
+    return run_recursive_model(model) # the float conversion waits for the GPU
+
+def time_recursive_PyTorch(multiplier: int, device: str = "auto", replication: str = "tile", block: int = 1):
+    if device == "auto":
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    device = torch.device(device)
     print(f"{device=}")
 
+    def build(replicas):
+        with device:
+            return ModelPoints(model_point_table, premium_table, replicas)
+
     with device:
         mp = ModelPoints(model_point_table, premium_table)
-        mp_multiplied = ModelPoints(model_point_table, premium_table, multiplier)
         assume = Assumptions(disc_rate_ann, mort_table)
         model = TermME(mp, assume)
 
-    if device.type == 'cuda':
-        time_recursive = time_recursive_GPU
-    else:
-        time_recursive = time_recursive_CPU
     run_recursive_model(model) # warm up, generate dependency graph
-    model.mp = mp_multiplied
-    result, time_in_seconds = time_recursive(model)
+    result, timer = run_replicated(build, lambda mp: run_model_points(model, mp), multiplier, replication, block)
+    time_in_seconds = timer.wall
     # report results
     print("PyTorch recursive model")
-    print(f"number modelpoints={len(mp_multiplied.duration_mth):,}")
+    print(f"number modelpoints={len(model_point_table) * multiplier:,} ({replication})")
     print(f"{result=:,}")
-    print(f"{time_in_seconds=}")
\ No newline at end of file
+    print(f"{time_in_seconds=}")
+    timer.report()
\ No newline at end of file
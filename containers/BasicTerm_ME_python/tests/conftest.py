@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+CONTAINER_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, CONTAINER_DIR)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def container_dir():
+    """The models read their inputs relative to the container directory when imported."""
+    cwd = os.getcwd()
+    os.chdir(CONTAINER_DIR)
+    yield
+    os.chdir(cwd)
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize("threads", ["1", "2"])
+def test_jax_iterative_runs_with_threads(threads):
+    pytest.importorskip("jax")
+    pytest.importorskip("equinox")
+    completed = subprocess.run(
+        [sys.executable, "main.py", "--model", "jax_iterative", "--device", "cpu", "--threads", threads, "--multiplier", "1"],
+        capture_output=True, text=True, timeout=600,
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert "result=215,146,132.068" in completed.stdout
+
+
+def test_numpy_iterative_runs_with_threads():
+    completed = subprocess.run(
+        [sys.executable, "main.py", "--model", "numpy_iterative", "--device", "cpu", "--threads", "2", "--multiplier", "1"],
+        capture_output=True, text=True, timeout=600,
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert "result=215,146,132.068" in completed.stdout
@@ -0,0 +1,52 @@
+import argparse
+import importlib
+
+import pytest
+
+from main import positive_int
+from replication import MODES, plan, run_replicated
+
+EXPECTED = 215146132.0684811
+
+
+def test_plan():
+    assert plan(7, "tile") == [(7, 1, 1)]
+    assert plan(7, "scale") == [(1, 1, 7)]
+    assert plan(7, "stream", 3) == [(3, 2, 1), (1, 1, 1)]
+    assert plan(6, "stream", 3) == [(3, 2, 1)]
+    assert plan(2, "stream", 3) == [(2, 1, 1)]
+
+
+@pytest.mark.parametrize("copies, block", [(0, 1), (1, 0)])
+def test_plan_rejects_empty_blocks(copies, block):
+    with pytest.raises(ValueError):
+        plan(copies, "stream", block)
+
+
+def test_positive_int():
+    assert positive_int("3") == 3
+    with pytest.raises(argparse.ArgumentTypeError):
+        positive_int("0")
+
+
+@pytest.fixture(scope="module")
+def numpy_model():
+    return importlib.import_module("term_me_iterative_numpy")
+
+
+def replicated(numpy_model, copies, mode, block=2):
+    assume = numpy_model.Assumptions(numpy_model.disc_rate_ann, numpy_model.mort_table)
+    return run_replicated(
+        lambda replicas: numpy_model.ModelPoints(numpy_model.model_point_table, numpy_model.premium_table, replicas),
+        lambda mp: numpy_model.run_numpy_term_ME(mp, assume),
+        copies, mode, block,
+    )
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_modes_match_tiled_model_points(numpy_model, mode):
+    tiled, _ = replicated(numpy_model, 3, "tile")
+    result, timer = replicated(numpy_model, 3, mode)
+    assert result == pytest.approx(tiled, rel=1e-13)
+    assert result == pytest.approx(3 * EXPECTED, rel=1e-11)
+    assert timer.wall > 0
@@ -0,0 +1,55 @@
+import importlib
+
+import numpy as np
+import pytest
+
+EXPECTED = 215146132.0684811
+
+
+@pytest.fixture(scope="module")
+def jax_model():
+    pytest.importorskip("jax")
+    pytest.importorskip("equinox")
+    return importlib.import_module("term_me_iterative_jax")
+
+
+@pytest.fixture(scope="module")
+def assume(jax_model):
+    return jax_model.AssumptionsEqx(jax_model.disc_rate_ann, jax_model.mort_table)
+
+
+def term_me(jax_model, assume, multiplier):
+    mp = jax_model.ModelPointsEqx(jax_model.model_point_table, jax_model.premium_table, size_multiplier=multiplier)
+    return jax_model.TermME(mp, assume)
+
+
+def run(jax_model, model):
+    return float(jax_model.compiled(jax_model.run_jax_term_ME_opt, model)[0](model))
+
+
+def test_bucket_size(jax_model):
+    assert jax_model.bucket_size(1) == jax_model.MIN_BUCKET
+    assert jax_model.bucket_size(jax_model.MIN_BUCKET) == jax_model.MIN_BUCKET
+    assert jax_model.bucket_size(jax_model.MIN_BUCKET + 1) == 2 * jax_model.MIN_BUCKET
+
+
+def test_padded_rows_have_no_policies(jax_model, assume):
+    mp = term_me(jax_model, assume, 2).mp
+    n = 2 * len(jax_model.model_point_table)
+    assert len(mp.policy_count) == jax_model.bucket_size(n)
+    assert not np.asarray(mp.policy_count[n:]).any()
+    assert mp.max_proj_len == int(np.max(12 * jax_model.model_point_table["policy_term"]
+                                          - jax_model.model_point_table["duration_mth"]) + 1)
+
+
+@pytest.mark.parametrize("multiplier", [1, 2])
+def test_padding_does_not_change_the_result(jax_model, assume, multiplier):
+    assert run(jax_model, term_me(jax_model, assume, multiplier)) == pytest.approx(multiplier * EXPECTED, rel=1e-12)
+
+
+def test_executables_are_reused_within_a_bucket(jax_model, assume):
+    model = term_me(jax_model, assume, 1)
+    run(jax_model, model)
+    executable, compile_time = jax_model.compiled(jax_model.run_jax_term_ME_opt, term_me(jax_model, assume, 1))
+    assert compile_time == 0.
+    assert executable is jax_model.compiled(jax_model.run_jax_term_ME_opt, model)[0]
@@ -0,0 +1,30 @@
+import importlib
+
+import numpy as np
+import pytest
+
+EXPECTED = 215146132.0684811
+
+
+@pytest.fixture(scope="module")
+def torch_model():
+    pytest.importorskip("torch")
+    pytest.importorskip("heavylight")
+    module = importlib.import_module("term_me_recursive_pytorch")
+    mp = module.ModelPoints(module.model_point_table, module.premium_table)
+    return module, module.TermME(mp, module.Assumptions(module.disc_rate_ann, module.mort_table))
+
+
+def test_result(torch_model):
+    module, model = torch_model
+    assert module.run_recursive_model(model) == pytest.approx(EXPECTED, rel=1e-12)
+
+
+def test_time_vectors_come_from_the_curve(torch_model):
+    _, model = torch_model
+    disc_rate_ann = model.assume.disc_rate_ann.numpy()
+    t = np.arange(model.mp.max_proj_len)
+    disc_rate_mth = (1 + disc_rate_ann[t // 12]) ** (1/12) - 1
+    np.testing.assert_allclose(model.disc_rate_mth().numpy(), disc_rate_mth, rtol=1e-14)
+    np.testing.assert_allclose(model.disc_factors().numpy(), (1 + disc_rate_mth) ** (-t), rtol=1e-12)
+    assert model.inflation_factor(24) == pytest.approx(1.01 ** 2, rel=1e-15)
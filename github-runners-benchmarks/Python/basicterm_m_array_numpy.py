@@ -1,19 +1,24 @@
 import numpy as np
 import pandas as pd
+from curves import curve
+from os.path import join
 
-# Read data using pandas
-mp = pd.read_csv("BasicTerm_M/model_point_table.csv")
-disc_rate = np.array(pd.read_csv("BasicTerm_M/disc_rate_ann.csv")["zero_spot"].values, dtype=np.float64)
-sum_assured = np.array(mp["sum_assured"].values, dtype=np.float64)
-policy_term = np.array(mp["policy_term"].values, dtype=np.int64)
-age_at_entry = np.array(mp["age_at_entry"].values, dtype=np.int64)
-mort = np.array(pd.read_csv("BasicTerm_M/mort_table.csv").drop(columns=["Age"]).values, dtype=np.float64)
+def parameters():
+    return {
+        "max_proj_len": 12 * 20 + 1,
+        "loading_prem": 0.5,
+        "expense_acq": 300.0,
+        "expense_maint": 60.0,
+        "inflation_rate": 0.01,
+    }
 
-def run(max_proj_len, disc_rate, sum_assured, policy_term, age_at_entry, mort, loading_prem, expense_acq, expense_maint, inflation_rate):
+def project(max_proj_len, disc_rate, sum_assured, policy_term, age_at_entry, mort, loading_prem, expense_acq, expense_maint, inflation_rate):
+    """Per-policy present values, each of shape (n_policies,)."""
+    time_curve = curve(disc_rate, inflation_rate, max_proj_len)
     time_axis = np.arange(max_proj_len)[:, None]
-    duration = time_axis // 12
-    discount_factors = np.power(1 + disc_rate[duration], -time_axis / 12)
-    inflation_factor = np.power(1 + inflation_rate, time_axis / 12)
+    duration = time_curve.duration[:, None]
+    discount_factors = time_curve.discount[:, None]
+    inflation_factor = time_curve.inflation_factor[:, None]
     lapse_rate = np.maximum(0.1 - 0.02 * duration, 0.02)
     lapse_rate_monthly = 1 - np.power(1 - lapse_rate, 1 / 12)
     attained_age = age_at_entry + duration
@@ -37,28 +42,71 @@ def run(max_proj_len, disc_rate, sum_assured, policy_term, age_at_entry, mort, l
     pv_expenses = np.sum(expenses * discount_factors, axis=0)
     pv_commissions = np.sum(commissions * discount_factors, axis=0)
     pv_net_cf = pv_premiums - pv_claims - pv_expenses - pv_commissions
-    return float(pv_net_cf.sum())
+    return {
+        "pv_premiums": pv_premiums,
+        "pv_claims": pv_claims,
+        "pv_expenses": pv_expenses,
+        "pv_commissions": pv_commissions,
+        "pv_net_cf": pv_net_cf,
+    }
+
+def load_assumptions(data_dir="BasicTerm_M"):
+    """Keyword arguments of ``project`` other than the model points."""
+    return {
+        "disc_rate": np.array(pd.read_csv(join(data_dir, "disc_rate_ann.csv"))["zero_spot"].values, dtype=np.float64),
+        "mort": np.array(pd.read_csv(join(data_dir, "mort_table.csv")).drop(columns=["Age"]).values, dtype=np.float64),
+        **parameters(),
+    }
+
+def load(data_dir="BasicTerm_M"):
+    """Keyword arguments of ``project`` for the model points in ``data_dir``."""
+    mp = pd.read_csv(join(data_dir, "model_point_table.csv"))
+    return {
+        **load_assumptions(data_dir),
+        "sum_assured": np.array(mp["sum_assured"].values, dtype=np.float64),
+        "policy_term": np.array(mp["policy_term"].values, dtype=np.int64),
+        "age_at_entry": np.array(mp["age_at_entry"].values, dtype=np.int64),
+    }
+
+def run(inputs):
+    return float(project(**inputs)["pv_net_cf"].sum())
+
+def model_point_chunks(path="BasicTerm_M/model_point_table.csv", chunk_size=100_000):
+    """Stream (sum_assured, policy_term, age_at_entry) arrays of at most chunk_size policies."""
+    columns = ["sum_assured", "policy_term", "age_at_entry"]
+    for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_size):
+        yield (
+            np.array(chunk["sum_assured"].values, dtype=np.float64),
+            np.array(chunk["policy_term"].values, dtype=np.int64),
+            np.array(chunk["age_at_entry"].values, dtype=np.int64),
+        )
+
+def run_chunked(max_proj_len, disc_rate, chunks, mort, loading_prem, expense_acq, expense_maint, inflation_rate):
+    """Run ``project`` one chunk of model points at a time and total the present values.
+
+    Peak memory is set by the chunk size rather than the portfolio size. Per-policy
+    values are identical to an unchunked run. The totals are summed chunk by chunk,
+    so they can differ from ``run`` in the last bits unless there is a single chunk.
+    """
+    totals = {}
+    n_policies = 0
+    for sum_assured, policy_term, age_at_entry in chunks:
+        pvs = project(max_proj_len, disc_rate, sum_assured, policy_term, age_at_entry, mort, loading_prem, expense_acq, expense_maint, inflation_rate)
+        for name, values in pvs.items():
+            totals[name] = totals.get(name, 0.0) + float(values.sum())
+        n_policies += len(sum_assured)
+    totals["n_policies"] = n_policies
+    return totals
 
 def basicterm_array_numpy():
-    # parameters
-    max_proj_len = 12 * 20 + 1
-    loading_prem = 0.5
-    expense_acq = 300.0
-    expense_maint = 60.0
-    inflation_rate = 0.01
+    return run(load())
 
-    return run(
-        max_proj_len,
-        disc_rate,
-        sum_assured,
-        policy_term,
-        age_at_entry,
-        mort,
-        loading_prem,
-        expense_acq,
-        expense_maint,
-        inflation_rate,
+def basicterm_array_numpy_chunked(chunk_size=100_000, data_dir="BasicTerm_M"):
+    totals = run_chunked(
+        chunks=model_point_chunks(join(data_dir, "model_point_table.csv"), chunk_size),
+        **load_assumptions(data_dir),
     )
+    return totals["pv_net_cf"]
 
 if __name__ == "__main__":
     print(basicterm_array_numpy())
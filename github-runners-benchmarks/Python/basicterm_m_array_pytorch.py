@@ -1,26 +1,32 @@
 import torch
 import pandas as pd
+from curves import curve
+from os.path import join
 
-# Ensure PyTorch uses double precision (64-bit) by default, similar to JAX configuration
-torch.set_default_dtype(torch.float64)
+def load(data_dir="BasicTerm_M"):
+    """Arguments of ``project`` for the model points in ``data_dir``."""
+    # Ensure PyTorch uses double precision (64-bit) by default, similar to JAX configuration
+    torch.set_default_dtype(torch.float64)
+    mp = pd.read_csv(join(data_dir, "model_point_table.csv"))
+    return {
+        "max_proj_len": 12 * 20 + 1,
+        "disc_rate": torch.tensor(pd.read_csv(join(data_dir, "disc_rate_ann.csv"))["zero_spot"].values),
+        "sum_assured": torch.tensor(mp["sum_assured"].values),
+        "policy_term": torch.tensor(mp["policy_term"].values),
+        "age_at_entry": torch.tensor(mp["age_at_entry"].values),
+        "mort": torch.tensor(pd.read_csv(join(data_dir, "mort_table.csv")).drop(columns=["Age"]).values),
+        "loading_prem": torch.tensor(0.5),
+        "expense_acq": torch.tensor(300.0),
+        "expense_maint": torch.tensor(60.0),
+        "inflation_rate": torch.tensor(0.01),
+    }
 
-# Random uniform distribution in PyTorch
-x = torch.rand(1000, dtype=torch.float64)
-print(f"{x.dtype=}")  # --> dtype('torch.float64')
-
-
-mp = pd.read_csv("BasicTerm_M/model_point_table.csv")
-disc_rate = torch.tensor(pd.read_csv("BasicTerm_M/disc_rate_ann.csv")["zero_spot"].values)
-sum_assured = torch.tensor(mp["sum_assured"].values)
-policy_term = torch.tensor(mp["policy_term"].values)
-age_at_entry = torch.tensor(mp["age_at_entry"].values)
-mort = torch.tensor(pd.read_csv("BasicTerm_M/mort_table.csv").drop(columns=["Age"]).values)
-
-def run(max_proj_len, disc_rate, sum_assured, policy_term, age_at_entry, mort, loading_prem, expense_acq, expense_maint, inflation_rate):
+def project(max_proj_len, disc_rate, sum_assured, policy_term, age_at_entry, mort, loading_prem, expense_acq, expense_maint, inflation_rate):
+    time_curve = curve(disc_rate.numpy(), inflation_rate, max_proj_len)
     time_axis = torch.arange(max_proj_len)[:, None]
     duration = time_axis // 12
-    discount_factors = (1 + disc_rate[duration]) ** (-time_axis / 12)
-    inflation_factor = (1 + inflation_rate) ** (time_axis / 12)
+    discount_factors = torch.tensor(time_curve.discount)[:, None]
+    inflation_factor = torch.tensor(time_curve.inflation_factor)[:, None]
     lapse_rate = torch.maximum(0.1 - 0.02 * duration, torch.tensor(0.02))
     lapse_rate_monthly = 1 - (1 - lapse_rate) ** (1 / 12)
     attained_age = age_at_entry + duration
@@ -46,26 +52,11 @@ def run(max_proj_len, disc_rate, sum_assured, policy_term, age_at_entry, mort, l
     pv_net_cf = pv_premiums - pv_claims - pv_expenses - pv_commissions
     return float(pv_net_cf.sum())
 
-def basicterm_array_pytorch():
-    # parameters
-    max_proj_len = 12 * 20 + 1
-    loading_prem = torch.tensor(0.5)
-    expense_acq = torch.tensor(300.0)
-    expense_maint = torch.tensor(60.0)
-    inflation_rate = torch.tensor(0.01)
+def run(inputs):
+    return project(**inputs)
 
-    return run(
-        max_proj_len,
-        disc_rate,
-        sum_assured,
-        policy_term,
-        age_at_entry,
-        mort,
-        loading_prem,
-        expense_acq,
-        expense_maint,
-        inflation_rate,
-    )
+def basicterm_array_pytorch():
+    return run(load())
 
 if __name__ == "__main__":
     print(basicterm_array_pytorch())
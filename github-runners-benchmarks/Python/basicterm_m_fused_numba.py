@@ -0,0 +1,59 @@
+import numpy as np
+from numba import njit, prange
+from basicterm_m_array_numpy import load
+from curves import curve
+
+
+@njit(parallel=True, cache=True)
+def project_kernel(sum_assured, policy_term, age_at_entry, mort, discount, expense_factor, lapse_rate_mth,
+                   loading_prem, expense_acq, expense_maint):
+    """Per-policy PV of net cash flows, one compiled loop over the months of each policy.
+
+    The premium is set from the PVs of claims and policies in force, so the
+    loop accumulates those and applies the premium to the PVs afterwards.
+    """
+    n = len(sum_assured)
+    max_proj_len = len(discount)
+    pv_net_cf = np.empty(n)
+    for i in prange(n):
+        pols_if = 1.0
+        pv_claims = 0.0
+        pv_pols_if = 0.0
+        pv_pols_if_first_year = 0.0
+        pv_expenses = expense_acq * discount[0]
+        for t in range(min(max_proj_len, 12 * policy_term[i])):
+            duration = t // 12
+            mort_rate = mort[age_at_entry[i] + duration - 18, min(duration, 5)]
+            mort_rate_mth = 1 - (1 - mort_rate) ** (1 / 12)
+            pols_death = pols_if * mort_rate_mth
+            pv_claims += sum_assured[i] * pols_death * discount[t]
+            pv_pols_if += pols_if * discount[t]
+            if duration == 0:
+                pv_pols_if_first_year += pols_if * discount[t]
+            pv_expenses += pols_if * expense_maint / 12 * expense_factor[t]
+            pols_if *= (1 - lapse_rate_mth[duration]) * (1 - mort_rate_mth)
+        premium_pp = np.round((1 + loading_prem) * pv_claims / pv_pols_if, 2)
+        pv_net_cf[i] = premium_pp * pv_pols_if - pv_claims - pv_expenses - premium_pp * pv_pols_if_first_year
+    return pv_net_cf
+
+
+def project(max_proj_len, disc_rate, sum_assured, policy_term, age_at_entry, mort, loading_prem, expense_acq, expense_maint, inflation_rate):
+    """Per-policy ``pv_net_cf`` of ``basicterm_m_array_numpy.project``."""
+    time_curve = curve(disc_rate, inflation_rate, max_proj_len)
+    duration = np.arange(max_proj_len // 12 + 1)
+    lapse_rate_mth = 1 - (1 - np.maximum(0.1 - 0.02 * duration, 0.02)) ** (1 / 12)
+    return project_kernel(
+        sum_assured, policy_term, age_at_entry, np.ascontiguousarray(mort), time_curve.discount,
+        time_curve.discount * time_curve.inflation_factor, lapse_rate_mth, loading_prem, expense_acq, expense_maint,
+    )
+
+
+def run(inputs):
+    return float(project(**inputs).sum())
+
+
+def basicterm_m_fused_numba():
+    return run(load())
+
+if __name__ == "__main__":
+    print(basicterm_m_fused_numba())
@@ -1,8 +1,12 @@
 import modelx as mx
 import numpy as np
 
-m = mx.read_model("BasicTerm_M")
+def load(data_dir="BasicTerm_M"):
+    return mx.read_model(data_dir)
 
-def basicterm_m_lifelib():
+def run(m):
     m.Projection.clear_cache = 1
-    return float(np.sum(m.Projection.pv_net_cf()))
\ No newline at end of file
+    return float(np.sum(m.Projection.pv_net_cf()))
+
+def basicterm_m_lifelib():
+    return run(load())
@@ -1,37 +1,30 @@
-from functools import wraps
-from collections import defaultdict
 import pandas as pd
 import torch
-
-torch.set_default_dtype(torch.float64)
+from cash import Cash
+from curves import curve as make_curve
+from os.path import join
 
 # constants
 max_proj_len = 12 * 20 + 1
 
-mp = pd.read_csv("BasicTerm_M/model_point_table.csv")
-disc_rate = torch.tensor(pd.read_csv("BasicTerm_M/disc_rate_ann.csv")['zero_spot'].values)
-mort_np = torch.tensor(pd.read_csv("BasicTerm_M/mort_table.csv").drop(columns=["Age"]).values)
-sum_assured = torch.tensor(mp["sum_assured"].values)
-issue_age = torch.tensor(mp["age_at_entry"].values)
-policy_term = torch.tensor(mp["policy_term"].values)
-
-# classes
-class Cash:
-    def __init__(self):
-        self.reset()
-
-    def reset(self):
-        self.caches = defaultdict(dict)
-
-    def __call__(self, func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            key = (args, frozenset(kwargs.items()))
-            if key not in self.caches[func.__name__]:
-                self.caches[func.__name__][key] = func(*args, **kwargs)
-            return self.caches[func.__name__][key]
+# inputs, set by use()
+disc_rate = mort_np = sum_assured = issue_age = policy_term = None
+
+def load(data_dir="BasicTerm_M"):
+    """Model points and assumptions in ``data_dir``, as read by ``use``."""
+    torch.set_default_dtype(torch.float64)
+    mp = pd.read_csv(join(data_dir, "model_point_table.csv"))
+    return {
+        "disc_rate": torch.tensor(pd.read_csv(join(data_dir, "disc_rate_ann.csv"))['zero_spot'].values),
+        "mort_np": torch.tensor(pd.read_csv(join(data_dir, "mort_table.csv")).drop(columns=["Age"]).values),
+        "sum_assured": torch.tensor(mp["sum_assured"].values),
+        "issue_age": torch.tensor(mp["age_at_entry"].values),
+        "policy_term": torch.tensor(mp["policy_term"].values),
+    }
 
-        return wrapper
+def use(inputs):
+    """Point the formulas at ``inputs`` returned by ``load``."""
+    globals().update(inputs)
 
 cash = Cash()
 
@@ -41,42 +34,48 @@ def get_annual_rate(duration: int):
 @cash
 def get_monthly_rate(duration: int):
     return 1 - (1 - get_annual_rate(duration)) ** (1/12)
-@cash
+@cash(lookback=0)
 def duration(t: int):
     return t // 12
-@cash
+@cash(lookback=1)
 def pols_death(t: int):
     return pols_if(t) * get_monthly_rate(duration(t))
-@cash
+@cash(lookback=1)
 def pols_if(t: int):
     if t == 0:
         return 1
     return pols_if(t - 1) - pols_lapse(t - 1) - pols_death(t - 1) - pols_maturity(t)
 
-@cash
+@cash(lookback=0)
 def lapse_rate(t: int):
     return max(0.1 - 0.02 * duration(t), 0.02)
-@cash
+@cash(lookback=1)
 def pols_lapse(t: int):
     return (pols_if(t) - pols_death(t)) * (1 - (1 - lapse_rate(t)) ** (1/12))
-@cash
+@cash(lookback=0)
 def pols_maturity(t: int):
     if t == 0:
         return 0
     return (t == 12 * policy_term) * (pols_if(t - 1) - pols_lapse(t - 1) - pols_death(t - 1))
 
 @cash
-def discount(t: int):
-    return (1 + disc_rate[duration(t)]) ** (-t/12)
+def curve():
+    return make_curve(disc_rate.numpy(), inflation_rate(), max_proj_len)
 @cash
+def discount_factors():
+    return torch.tensor(curve().discount)
+@cash(lookback=0)
+def discount(t: int):
+    return discount_factors()[t]
+@cash(lookback=0)
 def claims(t: int):
     return pols_death(t) * sum_assured
 @cash
 def inflation_rate():
     return 0.01
-@cash
+@cash(lookback=0)
 def inflation_factor(t):
-    return (1 + inflation_rate()) ** (t/12)
+    return float(curve().inflation_factor[t])
 @cash
 def expense_acq():
     return 300
@@ -95,14 +94,14 @@ def net_premium_pp():
 @cash
 def loading_prem():
     return 0.5
-@cash
+@cash(lookback=0)
 def expenses(t):
     return (t == 0) * expense_acq() * pols_if(t) \
            + pols_if(t) * expense_maint()/12 * inflation_factor(t)
 @cash
 def premium_pp():
     return torch.round((1 + loading_prem()) * net_premium_pp(), decimals=2)
-@cash
+@cash(lookback=0)
 def premiums(t):
     return premium_pp() * pols_if(t)
 @cash
@@ -111,13 +110,13 @@ def pv_premiums():
 @cash
 def pv_expenses():
     return sum(expenses(t) * discount(t) for t in range(max_proj_len))
-@cash
+@cash(lookback=0)
 def commissions(t):
         return (duration(t) == 0) * premiums(t)
 @cash
 def pv_commissions():
     return sum(commissions(t) * discount(t) for t in range(max_proj_len))
-@cash
+@cash(lookback=0)
 def net_cf(t):
     return premiums(t) - claims(t) - expenses(t) - commissions(t)
 @cash
@@ -137,14 +136,50 @@ def result_cf():
     return pd.DataFrame(data, index=t_len)
 
 
-def basicterm_recursive_pytorch():
-    cash.caches.clear()
+def accumulate_pvs():
+    """Fill the PV formulas in two forward passes over t.
+
+    The premium depends on ``pv_claims`` and ``pv_pols_if``, so those are
+    accumulated first. With ``cash.reset(sliding=True)`` each time step can be
+    evicted as soon as the next one is computed.
+    """
+    for pass_cfs in ({pv_claims: claims, pv_pols_if: pols_if},
+                     {pv_premiums: premiums, pv_expenses: expenses, pv_commissions: commissions}):
+        pvs = dict.fromkeys(pass_cfs, 0)
+        for t in range(max_proj_len):
+            for pv, cf in pass_cfs.items():
+                pvs[pv] = pvs[pv] + cf(t) * discount(t)
+        for pv, value in pvs.items():
+            cash.put(pv, value)
+
+def run(inputs):
+    use(inputs)
+    cash.reset() # Ensure the cache is clear before running calculations
     return float(torch.sum(pv_net_cf()).item())
 
+def run_sliding(inputs):
+    use(inputs)
+    cash.reset(sliding=True)
+    accumulate_pvs()
+    return float(torch.sum(pv_net_cf()).item())
+
+def run_replay(inputs):
+    use(inputs)
+    if cash.schedule is None:
+        cash.record(pv_net_cf) # warm-up run records the dependency graph
+    cash.reset()
+    cash.replay()
+    return float(torch.sum(pv_net_cf()).item())
+
+def basicterm_recursive_pytorch():
+    return run(load())
+
 
 
 
 def run_tests():
+    use(load())
+    cash.reset()
     # Note: The test values may need to be adjusted for PyTorch's precision and operation differences
     assert abs(pv_net_cf()[0] - 910.9206609336586) < 1e-3
     assert abs(pv_premiums()[0] - 8252.085855522233) < 1e-3
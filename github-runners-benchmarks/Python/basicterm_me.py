@@ -1,34 +1,19 @@
-import numpy as np
-import timeit
-from basicterm_me_lifelib import basicterm_me_lifelib
-from basicterm_me_recursive_numpy import basicterm_me_recursive_numpy
-from basicterm_me_heavylight_numpy import basicterm_me_heavylight_numpy
+from harness import run_isolated
+from importlib.util import find_spec
 from pprint import pprint
 
 
 def run_basic_term_me_benchmarks():
-    trials = 7
-    modelx_time = timeit.repeat(stmt="basicterm_me_lifelib()", setup="from basicterm_me_lifelib import basicterm_me_lifelib", number=1, repeat=trials)
-    modelx_result = basicterm_me_lifelib()
-    recursive_numpy_time = timeit.repeat(stmt="basicterm_me_recursive_numpy()", setup="from basicterm_me_recursive_numpy import basicterm_me_recursive_numpy", number=1, repeat=trials)
-    recursive_numpy_result = basicterm_me_recursive_numpy()
-    heavylight_time = timeit.repeat(stmt="basicterm_me_heavylight_numpy()", setup="from basicterm_me_heavylight_numpy import basicterm_me_heavylight_numpy", number=1, repeat=trials)
-    heavylight_result = basicterm_me_heavylight_numpy()
-    return {
-        "Python lifelib basic_term_me": {
-            "minimum time": f"{np.min(modelx_time)*1000} milliseconds",
-            "result": modelx_result,
-        },
-        "Python recursive numpy basic_term_me": {
-            "minimum time": f"{np.min(recursive_numpy_time)*1000} milliseconds",
-            "result": recursive_numpy_result,
-        },
-        "Python heavylight numpy basic_term_me": {
-            "minimum time": f"{np.min(heavylight_time)*1000} milliseconds",
-            "result": heavylight_result,
-        }
+    results = {
+        "Python lifelib basic_term_me": run_isolated("basicterm_me_lifelib"),
+        "Python recursive numpy basic_term_me": run_isolated("basicterm_me_recursive_numpy", profile=True),
+        "Python iterative numpy basic_term_me": run_isolated("basicterm_me_iterative_numpy"),
+        "Python heavylight numpy basic_term_me": run_isolated("basicterm_me_heavylight_numpy"),
     }
+    if find_spec("numba"): # optional backend
+        results["Python fused numba basic_term_me"] = run_isolated("basicterm_me_fused_numba")
+    return results
 
 if __name__ == "__main__":
     results = run_basic_term_me_benchmarks()
-    pprint(results)
\ No newline at end of file
+    pprint(results)
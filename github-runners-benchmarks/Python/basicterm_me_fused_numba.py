@@ -0,0 +1,63 @@
+import numpy as np
+from numba import njit, prange
+from basicterm_me_recursive_numpy import ModelPoints, Assumptions, load
+from basicterm_me_iterative_numpy import EXPENSE_ACQ, EXPENSE_MAINT, INFLATION_RATE, max_proj_len
+from curves import curve
+
+
+@njit(parallel=True, cache=True)
+def project_kernel(premium_pp, duration_mth, age_at_entry, sum_assured, policy_count, policy_term, mort_table,
+                   discount, expense_factor, expense_acq, expense_maint):
+    """Per-policy PV of net cash flows, one compiled loop over the months of each policy.
+
+    Nothing is in force before issue or after maturity, so mortality is only
+    looked up from issue and each policy stops at maturity.
+    """
+    n = len(duration_mth)
+    proj_len = len(discount)
+    pv_net_cf = np.empty(n)
+    for i in prange(n):
+        pols_if = policy_count[i] if duration_mth[i] > 0 else 0.0 # before maturity
+        pols_death = 0.0
+        pols_lapse = 0.0
+        pv = 0.0
+        for t in range(min(proj_len, 12 * policy_term[i] - duration_mth[i] + 1)):
+            duration_mth_t = duration_mth[i] + t
+            duration = duration_mth_t // 12
+            pols_if -= pols_lapse + pols_death
+            if duration_mth_t == 12 * policy_term[i]:
+                pols_if = 0.0
+            pols_new_biz = policy_count[i] if duration_mth_t == 0 else 0.0
+            pols_if += pols_new_biz # before decrements
+            mort_rate = mort_table[age_at_entry[i] + duration - 18, min(duration, 5)] if duration >= 0 else 0.0
+            pols_death = pols_if * (1 - (1 - mort_rate) ** (1 / 12))
+            premiums = premium_pp[i] * pols_if
+            commissions = premiums if duration == 0 else 0.0
+            pv += (premiums - sum_assured[i] * pols_death - commissions - expense_acq * pols_new_biz) * discount[t] \
+                - pols_if * expense_maint / 12 * expense_factor[t]
+            lapse_rate = max(0.1 - 0.02 * duration, 0.02)
+            pols_lapse = (pols_if - pols_death) * (1 - (1 - lapse_rate) ** (1 / 12))
+        pv_net_cf[i] = pv
+    return pv_net_cf
+
+
+def project(mp: ModelPoints, assume: Assumptions):
+    """Per-policy ``pv_net_cf`` of ``basicterm_me_recursive_numpy``."""
+    time_curve = curve(assume.disc_rate_ann, INFLATION_RATE, max_proj_len(mp))
+    return project_kernel(
+        mp.premium_pp.astype(np.float64), mp.duration_mth.astype(np.int64), mp.age_at_entry.astype(np.int64),
+        mp.sum_assured.astype(np.float64), mp.policy_count.astype(np.float64), mp.policy_term.astype(np.int64),
+        np.ascontiguousarray(assume.mort_table, dtype=np.float64),
+        time_curve.discount, time_curve.discount * time_curve.inflation_factor, float(EXPENSE_ACQ), float(EXPENSE_MAINT),
+    )
+
+
+def run(inputs):
+    return float(project(**inputs).sum())
+
+
+def basicterm_me_fused_numba():
+    return run(load())
+
+if __name__ == "__main__":
+    print(basicterm_me_fused_numba())
@@ -3,11 +3,9 @@ from collections import defaultdict
 import pandas as pd
 import numpy as np
 from heavylight.memory_optimized_model import LightModel
-
-disc_rate_ann = pd.read_excel("BasicTerm_ME/disc_rate_ann.xlsx", index_col=0)
-mort_table = pd.read_excel("BasicTerm_ME/mort_table.xlsx", index_col=0)
-model_point_table = pd.read_excel("BasicTerm_ME/model_point_table.xlsx", index_col=0)
-premium_table = pd.read_excel("BasicTerm_ME/premium_table.xlsx", index_col=[0,1])
+from xlsx_cache import read_excel
+from curves import curve
+from os.path import join
 
 class ModelPoints:
     def __init__(self, model_point_table: pd.DataFrame, premium_table: pd.DataFrame):
@@ -48,14 +46,17 @@ class TermME(LightModel):
     def commissions(self, t):
         return (self.duration(t) == 0) * self.premiums(t)
     
+    def curve(self):
+        return curve(self.assume.disc_rate_ann, self.inflation_rate(), self.mp.max_proj_len)
+    
     def disc_factors(self):
-        return np.array(list((1 + self.disc_rate_mth()[t])**(-t) for t in range(self.mp.max_proj_len)))
+        return self.curve().discount
     
     def discount(self, t: int):
-        return (1 + self.assume.disc_rate_ann[t//12]) ** (-t/12)
+        return self.curve().discount[t]
     
     def disc_rate_mth(self):
-        return np.array(list((1 + self.assume.disc_rate_ann[t//12])**(1/12) - 1 for t in range(self.mp.max_proj_len)))
+        return self.curve().disc_rate_mth
     
     def duration(self, t):
         return self.duration_mth(t) //12
@@ -77,7 +78,7 @@ class TermME(LightModel):
             + self.pols_if_at(t, "BEF_DECR") * self.expense_maint()/12 * self.inflation_factor(t)
     
     def inflation_factor(self, t):
-        return (1 + self.inflation_rate())**(t/12)
+        return self.curve().inflation_factor[t]
     
     def inflation_rate(self):
         return 0.01
@@ -131,15 +132,22 @@ class TermME(LightModel):
     def premiums(self, t):
         return self.mp.premium_pp * self.pols_if_at(t, "BEF_DECR")
     
-mp = ModelPoints(model_point_table, premium_table)
-assume = Assumptions(disc_rate_ann, mort_table)
-model = TermME(mp, assume)
+def load(data_dir="BasicTerm_ME"):
+    """The ``TermME`` model for the model points and assumptions in ``data_dir``."""
+    disc_rate_ann = read_excel(join(data_dir, "disc_rate_ann.xlsx"), index_col=0)
+    mort_table = read_excel(join(data_dir, "mort_table.xlsx"), index_col=0)
+    model_point_table = read_excel(join(data_dir, "model_point_table.xlsx"), index_col=0)
+    premium_table = read_excel(join(data_dir, "premium_table.xlsx"), index_col=[0,1])
+    return TermME(ModelPoints(model_point_table, premium_table), Assumptions(disc_rate_ann, mort_table))
 
-def basicterm_me_heavylight_numpy():
+def run(model):
     model.ResetCache()
     tot = sum(np.sum(model.premiums(t) - model.claims(t) - model.expenses(t) - model.commissions(t)) \
               * model.discount(t) for t in range(model.mp.max_proj_len))
     return float(tot)
 
+def basicterm_me_heavylight_numpy():
+    return run(load())
+
 if __name__ == "__main__":
      print(basicterm_me_heavylight_numpy())
@@ -0,0 +1,111 @@
+# The constants, max_proj_len and project are copied to containers/BasicTerm_ME_python/term_me_iterative_numpy.py,
+# keep them in sync.
+import pandas as pd
+import numpy as np
+from basicterm_me_recursive_numpy import ModelPoints, Assumptions, load
+from curves import curve
+
+CASHFLOWS = ["Premiums", "Claims", "Expenses", "Commissions", "Net Cashflow"]
+EXPENSE_ACQ = 300
+EXPENSE_MAINT = 60
+INFLATION_RATE = 0.01
+
+
+def max_proj_len(mp):
+    return int(np.max(np.maximum(12 * mp.policy_term - mp.duration_mth + 1, 0)))
+
+
+def project(mp: ModelPoints, assume: Assumptions):
+    """Project the model points one month at a time, like the JAX ``lax.scan`` model.
+
+    Only the previous month's decrements are carried from step to step, in
+    buffers of one value per model point that are overwritten in place, so
+    memory does not grow with the projection length. Returns the totals over
+    the model points of each cash flow in ``CASHFLOWS`` by month, and the
+    monthly discount factors.
+    """
+    n = len(mp.duration_mth)
+    proj_len = max_proj_len(mp)
+    time_curve = curve(assume.disc_rate_ann, INFLATION_RATE, proj_len)
+    inflation_factor = time_curve.inflation_factor
+    mort_table = np.ascontiguousarray(assume.mort_table, dtype=np.float64)
+    mort_flat = mort_table.ravel()
+
+    policy_count = mp.policy_count.astype(np.float64)
+    premium_pp = mp.premium_pp.astype(np.float64)
+    sum_assured = mp.sum_assured.astype(np.float64)
+    maturity_mth = 12 * mp.policy_term.astype(np.int64)
+    duration_mth = mp.duration_mth.astype(np.int64) # advanced in place each month
+
+    # carried state: pols_if holds pols_if_at(t, "BEF_MAT") at the start of each month
+    pols_if = np.where(duration_mth > 0, policy_count, 0.)
+    pols_death = np.zeros(n)
+    pols_lapse = np.zeros(n)
+    # work buffers
+    duration = np.empty(n, dtype=np.int64)
+    select_duration = np.empty(n, dtype=np.int64)
+    index = np.empty(n, dtype=np.int64)
+    flag = np.empty(n, dtype=bool)
+    pols_new_biz = np.empty(n)
+    rate = np.empty(n)
+    work = np.empty(n)
+
+    totals = np.zeros((len(CASHFLOWS), proj_len))
+    premiums, claims, expenses, commissions, net_cf = totals
+    for s in range(proj_len):
+        if s > 0:
+            duration_mth += 1
+            pols_if -= pols_lapse
+            pols_if -= pols_death
+        np.floor_divide(duration_mth, 12, out=duration)
+        np.equal(duration_mth, maturity_mth, out=flag)
+        pols_if -= np.multiply(flag, pols_if, out=work) # maturities, now BEF_NB
+        np.equal(duration_mth, 0, out=flag)
+        np.multiply(flag, policy_count, out=pols_new_biz)
+        pols_if += pols_new_biz # now BEF_DECR
+
+        # mort_table[age - 18, min(duration, 5)] without a fancy-indexing temporary
+        np.add(mp.age_at_entry, duration, out=index)
+        index -= 18
+        index *= mort_table.shape[1]
+        index += np.minimum(duration, 5, out=select_duration)
+        np.take(mort_flat, index, out=rate)
+        np.subtract(1, rate, out=rate)
+        np.power(rate, 1/12, out=rate)
+        np.subtract(1, rate, out=rate)
+        np.multiply(pols_if, rate, out=pols_death)
+
+        premiums[s] = premium_pp @ pols_if
+        claims[s] = sum_assured @ pols_death
+        expenses[s] = EXPENSE_ACQ * pols_new_biz.sum() + pols_if.sum() * EXPENSE_MAINT/12 * inflation_factor[s]
+        np.equal(duration, 0, out=flag)
+        commissions[s] = premium_pp @ np.multiply(flag, pols_if, out=work)
+
+        np.multiply(duration, -0.02, out=rate)
+        rate += 0.1
+        np.maximum(rate, 0.02, out=rate)
+        np.subtract(1, rate, out=rate)
+        np.power(rate, 1/12, out=rate)
+        np.subtract(1, rate, out=rate)
+        np.subtract(pols_if, pols_death, out=pols_lapse)
+        pols_lapse *= rate
+    net_cf[:] = premiums - claims - expenses - commissions
+    return dict(zip(CASHFLOWS, totals)), time_curve.discount
+
+
+def result_cf(inputs):
+    """Total cash flows by month, as ``result_cf`` of the recursive model."""
+    cashflows, _ = project(**inputs)
+    return pd.DataFrame(cashflows)
+
+
+def run(inputs):
+    cashflows, discount = project(**inputs)
+    return float(cashflows["Net Cashflow"] @ discount)
+
+
+def basicterm_me_iterative_numpy():
+    return run(load())
+
+if __name__ == "__main__":
+    print(basicterm_me_iterative_numpy())
@@ -1,11 +1,15 @@
 import modelx as mx
 import numpy as np
 
-m = mx.read_model("BasicTerm_ME")
+def load(data_dir="BasicTerm_ME"):
+    return mx.read_model(data_dir)
 
-def basicterm_me_lifelib():
+def run(m):
     m.Projection.clear_cache = 1
     return float(np.sum(m.Projection.pv_net_cf()))
 
+def basicterm_me_lifelib():
+    return run(load())
+
 if __name__ == "__main__":
-    print(basicterm_me_lifelib())
\ No newline at end of file
+    print(basicterm_me_lifelib())
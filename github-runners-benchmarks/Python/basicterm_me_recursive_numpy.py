@@ -1,32 +1,12 @@
-from functools import wraps
-from collections import defaultdict
 import pandas as pd
 import numpy as np
-
-class Cash:
-    def __init__(self):
-        self.reset()
-
-    def reset(self):
-        self.caches = defaultdict(dict)
-
-    def __call__(self, func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            key = (args, frozenset(kwargs.items()))
-            if key not in self.caches[func.__name__]:
-                self.caches[func.__name__][key] = func(*args, **kwargs)
-            return self.caches[func.__name__][key]
-
-        return wrapper
+from cash import Cash
+from curves import curve as make_curve
+from xlsx_cache import read_excel
+from os.path import join
 
 cash = Cash()
 
-disc_rate_ann = pd.read_excel("BasicTerm_ME/disc_rate_ann.xlsx", index_col=0)
-mort_table = pd.read_excel("BasicTerm_ME/mort_table.xlsx", index_col=0)
-model_point_table = pd.read_excel("BasicTerm_ME/model_point_table.xlsx", index_col=0)
-premium_table = pd.read_excel("BasicTerm_ME/premium_table.xlsx", index_col=[0,1])
-
 class ModelPoints:
     def __init__(self, model_point_table: pd.DataFrame, premium_table: pd.DataFrame):
         self.table = model_point_table.merge(premium_table, left_on=["age_at_entry", "policy_term"], right_index=True)
@@ -47,42 +27,61 @@ class Assumptions:
     def get_mortality(self, age, duration):
         return self.mort_table[age-18, np.minimum(duration, 5)]
 
-mp = ModelPoints(model_point_table, premium_table)
-assume = Assumptions(disc_rate_ann, mort_table)
+# inputs, set by use()
+mp = assume = None
+
+def load(data_dir="BasicTerm_ME"):
+    """Model points and assumptions in ``data_dir``, as read by ``use``."""
+    disc_rate_ann = read_excel(join(data_dir, "disc_rate_ann.xlsx"), index_col=0)
+    mort_table = read_excel(join(data_dir, "mort_table.xlsx"), index_col=0)
+    model_point_table = read_excel(join(data_dir, "model_point_table.xlsx"), index_col=0)
+    premium_table = read_excel(join(data_dir, "premium_table.xlsx"), index_col=[0,1])
+    return {
+        "mp": ModelPoints(model_point_table, premium_table),
+        "assume": Assumptions(disc_rate_ann, mort_table),
+    }
 
-@cash
+def use(inputs):
+    """Point the formulas at ``inputs`` returned by ``load``."""
+    globals().update(inputs)
+
+@cash(lookback=0)
 def age(t):
     return mp.age_at_entry + duration(t)
 
-@cash
+@cash(lookback=0)
 def claim_pp(t):
     return mp.sum_assured
 
-@cash
+@cash(lookback=0)
 def claims(t):
     return claim_pp(t) * pols_death(t)
 
-@cash
+@cash(lookback=0)
 def commissions(t):
     return (duration(t) == 0) * premiums(t)
 
 @cash
-def disc_factors():
-    return np.array(list((1 + disc_rate_mth()[t])**(-t) for t in range(max_proj_len())))
+def curve():
+    return make_curve(assume.disc_rate_ann, inflation_rate(), max_proj_len())
 
 @cash
+def disc_factors():
+    return curve().discount
+
+@cash(lookback=0)
 def discount(t: int):
-    return (1 + assume.disc_rate_ann[t//12]) ** (-t/12)
+    return curve().discount[t]
 
 @cash
 def disc_rate_mth():
-    return np.array(list((1 + assume.disc_rate_ann[t//12])**(1/12) - 1 for t in range(max_proj_len())))
+    return curve().disc_rate_mth
 
-@cash
+@cash(lookback=0)
 def duration(t):
     return duration_mth(t) //12
 
-@cash
+@cash(lookback=1)
 def duration_mth(t):
     if t == 0:
         return mp.duration_mth
@@ -97,20 +96,20 @@ def expense_acq():
 def expense_maint():
     return 60
 
-@cash
+@cash(lookback=0)
 def expenses(t):
     return expense_acq() * pols_new_biz(t) \
         + pols_if_at(t, "BEF_DECR") * expense_maint()/12 * inflation_factor(t)
 
-@cash
+@cash(lookback=0)
 def inflation_factor(t):
-    return (1 + inflation_rate())**(t/12)
+    return curve().inflation_factor[t]
 
 @cash
 def inflation_rate():
     return 0.01
 
-@cash
+@cash(lookback=0)
 def lapse_rate(t):
     return np.maximum(0.1 - 0.02 * duration(t), 0.02)
 
@@ -122,27 +121,27 @@ def loading_prem():
 def max_proj_len():
     return max(proj_len())
 
-@cash
+@cash(lookback=0)
 def mort_rate(t):
     return assume.get_mortality(age(t), duration(t))
 
-@cash
+@cash(lookback=0)
 def mort_rate_mth(t):
     return 1-(1- mort_rate(t))**(1/12)
 
-@cash
+@cash(lookback=0)
 def net_cf(t):
     return premiums(t) - claims(t) - expenses(t) - commissions(t)
 
-@cash
+@cash(lookback=1)
 def pols_death(t):
     return pols_if_at(t, "BEF_DECR") * mort_rate_mth(t)
 
-@cash
+@cash(lookback=0)
 def pols_if(t):
     return pols_if_at(t, "BEF_MAT")
 
-@cash
+@cash(lookback=1)
 def pols_if_at(t, timing):
     if timing == "BEF_MAT":
         if t == 0:
@@ -160,19 +159,19 @@ def pols_if_at(t, timing):
 def pols_if_init():
     return np.where(duration_mth(0) > 0, mp.policy_count, 0)
 
-@cash
+@cash(lookback=1)
 def pols_lapse(t):
     return (pols_if_at(t, "BEF_DECR") - pols_death(t)) * (1-(1 - lapse_rate(t))**(1/12))
 
-@cash
+@cash(lookback=0)
 def pols_maturity(t):
     return (duration_mth(t) == mp.policy_term * 12) * pols_if_at(t, "BEF_MAT")
 
-@cash
+@cash(lookback=0)
 def pols_new_biz(t):
     return np.where(duration_mth(t) == 0, mp.policy_count, 0)
 
-@cash
+@cash(lookback=0)
 def premiums(t):
     return mp.premium_pp * pols_if_at(t, "BEF_DECR")
 
@@ -233,10 +232,45 @@ def result_pols():
     return pd.DataFrame(data, index=t_len)
 
 
-def basicterm_me_recursive_numpy():
+def accumulate_pvs():
+    """Fill the PV formulas in a single forward pass over t.
+
+    With ``cash.reset(sliding=True)`` each time step can be evicted as soon as
+    the next one is computed, so memory does not grow with the projection length.
+    """
+    pvs = {pv_premiums: 0, pv_claims: 0, pv_expenses: 0, pv_commissions: 0}
+    cfs = {pv_premiums: premiums, pv_claims: claims, pv_expenses: expenses, pv_commissions: commissions}
+    for t in range(max_proj_len()):
+        for pv, cf in cfs.items():
+            pvs[pv] = pvs[pv] + cf(t) * discount(t)
+    for pv, value in pvs.items():
+        cash.put(pv, value)
+
+
+def run(inputs):
+    use(inputs)
     cash.reset()
     return float(np.sum(pv_net_cf()))
 
-if __name__ == "__main__":
+
+def run_sliding(inputs):
+    use(inputs)
+    cash.reset(sliding=True)
+    accumulate_pvs()
+    return float(np.sum(pv_net_cf()))
+
+
+def run_replay(inputs):
+    use(inputs)
+    if cash.schedule is None:
+        cash.record(pv_net_cf) # warm-up run records the dependency graph
     cash.reset()
-    print(basicterm_me_recursive_numpy())
\ No newline at end of file
+    cash.replay()
+    return float(np.sum(pv_net_cf()))
+
+
+def basicterm_me_recursive_numpy():
+    return run(load())
+
+if __name__ == "__main__":
+    print(basicterm_me_recursive_numpy())
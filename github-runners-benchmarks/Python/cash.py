@@ -0,0 +1,351 @@
+from functools import wraps
+from collections import defaultdict
+from heapq import heapify, heappop, heappush
+from timeit import default_timer
+import inspect
+import sys
+
+_MISSING = object()
+
+
+class FormulaCache:
+    """Cached results of one formula.
+
+    Calls ``f(t)`` and ``f(t, variant)`` with a non-negative integer ``t`` are
+    stored in one list per variant (e.g. per ``timing`` or ``kind`` string),
+    indexed by ``t``, and calls without arguments in a single slot. Any other
+    call falls back to a dict keyed on the arguments. The lists live as long
+    as the formula, so wrappers can hold on to them across resets.
+    """
+    def __init__(self, func, lookback):
+        self.func = func
+        self.lookback = lookback
+        params = list(inspect.signature(func).parameters.values())
+        self.is_scalar = not params
+        self.is_time_indexed = params[:1] != [] and params[0].name == "t" and len(params) <= 2
+        self.has_variant = self.is_time_indexed and len(params) == 2
+        self.default_variant = None
+        if self.has_variant and params[1].default is not params[1].empty:
+            self.default_variant = params[1].default
+        self.variant_name = params[1].name if self.has_variant else None
+        self.scalar = [_MISSING]
+        self.rows = {}
+        self.bounds = {}
+        self.other = {}
+
+    def clear(self):
+        self.scalar[0] = _MISSING
+        for row in self.rows.values():
+            row.clear()
+        self.bounds.clear()
+        self.other.clear()
+
+    def bind_variant(self, variant, kwargs):
+        """Variant of a call that passed it by the formula's own name, e.g. ``timing="BEF_MAT"``."""
+        for name in kwargs:
+            if name != self.variant_name:
+                raise TypeError(f"{self.func.__name__}() got an unexpected keyword argument '{name}'")
+        if variant is not _MISSING:
+            raise TypeError(f"{self.func.__name__}() got multiple values for argument '{self.variant_name}'")
+        return kwargs[self.variant_name]
+
+    def row(self, variant, t=0):
+        row = self.rows.get(variant)
+        if row is None:
+            row = self.rows[variant] = []
+        if variant not in self.bounds:
+            self.bounds[variant] = (t, t)
+        if t >= len(row):
+            row.extend([_MISSING] * (max(t + 1, 2 * len(row)) - len(row)))
+        return row
+
+    def evict(self, variant, t):
+        """Drop the entries of ``variant`` further than ``lookback`` from ``t``."""
+        row, (lo, hi) = self.rows[variant], self.bounds[variant]
+        keep_lo, keep_hi = t - self.lookback, t + self.lookback
+        for i in range(lo, min(hi + 1, keep_lo)):
+            row[i] = _MISSING
+        for i in range(max(lo, keep_hi + 1), hi + 1):
+            row[i] = _MISSING
+        self.bounds[variant] = (min(t, max(lo, keep_lo)), max(t, min(hi, keep_hi)))
+
+    def get(self, args, kwargs):
+        if self.is_scalar:
+            return self.scalar[0]
+        elif self.is_time_indexed and args and not kwargs and args[0] >= 0:
+            variant = args[1] if len(args) == 2 else self.default_variant
+            row = self.rows.get(variant)
+            if row is not None and args[0] < len(row):
+                return row[args[0]]
+            return _MISSING
+        return self.other.get((args, frozenset(kwargs.items())), _MISSING)
+
+    def put(self, value, args, kwargs, sliding=False):
+        if self.is_scalar:
+            self.scalar[0] = value
+        elif self.is_time_indexed and args and not kwargs and args[0] >= 0:
+            variant = args[1] if len(args) == 2 else self.default_variant
+            self.row(variant, args[0])[args[0]] = value
+            if sliding and self.lookback is not None:
+                self.evict(variant, args[0])
+        else:
+            self.other[(args, frozenset(kwargs.items()))] = value
+
+    def values(self):
+        if self.scalar[0] is not _MISSING:
+            yield self.scalar[0]
+        for row in self.rows.values():
+            yield from (value for value in row if value is not _MISSING)
+        yield from self.other.values()
+
+    def nbytes(self):
+        return sum(nbytes(value) for value in self.values())
+
+
+def nbytes(value):
+    """Bytes held by a cached value: array buffers, or the object itself."""
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    return sys.getsizeof(value)
+
+
+class Recorder:
+    """Call graph of one run of the formulas.
+
+    Every call is a node ``(cache, args, kwargs)``. ``deps`` maps each computed
+    node to the nodes it called, and ``order`` lists nodes as they finish.
+    """
+    def __init__(self, cash):
+        self.cash = cash
+        self.deps = {}
+        self.order = []
+        self.stack = []
+
+    def call(self, cache, args, kwargs):
+        node = (cache, args, frozenset(kwargs.items()))
+        if self.stack:
+            self.deps[self.stack[-1]].append(node)
+        value = cache.get(args, kwargs)
+        if value is _MISSING:
+            self.deps[node] = []
+            self.stack.append(node)
+            try:
+                value = cache.func(*args, **kwargs)
+            finally:
+                self.stack.pop()
+            cache.put(value, args, kwargs, self.cash.sliding)
+            self.order.append(node)
+        return value
+
+    @staticmethod
+    def step(node):
+        cache, args, _ = node
+        return args[0] if cache.is_time_indexed and args else -1
+
+    def schedule(self):
+        """Topological order of the recorded nodes, earliest time step first."""
+        deps = {node: set(children) for node, children in self.deps.items()}
+        dependents = defaultdict(list)
+        for node, children in deps.items():
+            for child in children:
+                dependents[child].append(node)
+        position = {node: i for i, node in enumerate(self.order)}
+        waiting = {node: len(children) for node, children in deps.items()}
+        ready = [(self.step(node), position[node], node) for node, n in waiting.items() if n == 0]
+        heapify(ready)
+        schedule = []
+        while ready:
+            node = heappop(ready)[2]
+            schedule.append(node)
+            for parent in dependents[node]:
+                waiting[parent] -= 1
+                if waiting[parent] == 0:
+                    heappush(ready, (self.step(parent), position[parent], parent))
+        return schedule
+
+
+class Profiler:
+    """Per-formula call counts and timings of one run of the formulas.
+
+    Self time, in ms, excludes the time spent computing the formulas it called.
+    """
+    def __init__(self, cash):
+        self.cash = cash
+        self.stats = defaultdict(lambda: {"calls": 0, "hits": 0, "misses": 0, "self time ms": 0.0})
+        self.child_time = [0.0]
+
+    def call(self, cache, args, kwargs):
+        stats = self.stats[cache.func.__name__]
+        stats["calls"] += 1
+        value = cache.get(args, kwargs)
+        if value is not _MISSING:
+            stats["hits"] += 1
+            return value
+        stats["misses"] += 1
+        self.child_time.append(0.0)
+        start = default_timer()
+        try:
+            value = cache.func(*args, **kwargs)
+        finally:
+            elapsed = default_timer() - start
+            stats["self time ms"] += (elapsed - self.child_time.pop()) * 1000
+            self.child_time[-1] += elapsed
+        cache.put(value, args, kwargs, self.cash.sliding)
+        return value
+
+
+class Cash:
+    """Memoizer shared by the recursive models.
+
+    Results are cached per formula in a ``FormulaCache``, so the hot path is a
+    list index rather than hashing the call arguments. A time-indexed formula
+    (first positional argument ``t``) can declare a ``lookback``: how many
+    time steps away from ``t`` other formulas still read it, e.g.
+    ``pols_if_at`` reads ``t-1`` so it declares ``lookback=1``.
+
+    After ``reset(sliding=True)`` entries further than ``lookback`` steps from
+    the most recently computed ``t`` are evicted, so a forward pass over ``t``
+    keeps only a few time steps per formula in memory. Formulas without a
+    ``lookback`` are never evicted.
+
+    ``record(target)`` runs a warm-up and keeps the call graph as a schedule
+    that survives ``reset``. ``replay()`` then evaluates the schedule one time
+    step at a time, so each formula finds its dependencies already cached and
+    nothing recurses. Calls missing from the schedule, e.g. after the
+    projection got longer, are still computed on demand.
+
+    ``profile(target)`` runs ``target`` with per-formula instrumentation, and
+    ``report()`` / ``report_table()`` summarise calls, cache hits and misses,
+    self time and the bytes each formula's cache held at the end of the run.
+    """
+    def __init__(self):
+        self.caches = {}
+        self.tracer = None
+        self.schedule = None
+        self.profile_stats = None
+        self.reset()
+
+    def reset(self, sliding=False):
+        for cache in self.caches.values():
+            cache.clear()
+        self.sliding = sliding
+
+    def put(self, func, value, *args, **kwargs):
+        """Store ``value`` as the result of ``func(*args, **kwargs)``."""
+        self.caches[func.__name__].put(value, args, kwargs, self.sliding)
+
+    def record(self, target, *args, **kwargs):
+        """Reset, run ``target`` and keep the schedule of the formulas it called."""
+        self.reset()
+        self.tracer = recorder = Recorder(self)
+        try:
+            result = target(*args, **kwargs)
+        finally:
+            self.tracer = None
+        self.schedule = recorder.schedule()
+        return result
+
+    def profile(self, target, *args, **kwargs):
+        """Run ``target`` with instrumentation and keep the stats for ``report``."""
+        self.tracer = profiler = Profiler(self)
+        try:
+            result = target(*args, **kwargs)
+        finally:
+            self.tracer = None
+        self.profile_stats = dict(profiler.stats)
+        for name, stats in self.profile_stats.items():
+            stats["bytes"] = self.caches[name].nbytes()
+        return result
+
+    def nbytes(self):
+        """Bytes currently held by all formula caches."""
+        return sum(cache.nbytes() for cache in self.caches.values())
+
+    def report(self, top=None):
+        """Stats of the last ``profile`` run by formula, highest self time first."""
+        ranked = sorted(self.profile_stats.items(), key=lambda item: -item[1]["self time ms"])
+        return dict(ranked[:top])
+
+    def report_table(self, top=None):
+        lines = [f"{'formula':<24}{'calls':>9}{'hits':>9}{'misses':>9}{'self ms':>10}{'MB':>9}"]
+        for name, s in self.report(top).items():
+            lines.append(f"{name:<24}{s['calls']:>9}{s['hits']:>9}{s['misses']:>9}"
+                         f"{s['self time ms']:>10.1f}{s['bytes'] / 1e6:>9.2f}")
+        return "\n".join(lines)
+
+    def replay(self):
+        """Evaluate the recorded schedule in order."""
+        for cache, args, kwargs in self.schedule:
+            cache.wrapper(*args, **dict(kwargs))
+
+    def __call__(self, func=None, *, lookback=None):
+        if func is None:
+            return lambda func: self(func, lookback=lookback)
+
+        cache = self.caches[func.__name__] = FormulaCache(func, lookback)
+        scalar, rows, other = cache.scalar, cache.rows, cache.other
+
+        def general(*args, **kwargs):
+            if self.tracer is not None:
+                return self.tracer.call(cache, args, kwargs)
+            key = (args, frozenset(kwargs.items()))
+            if key in other:
+                return other[key]
+            value = other[key] = func(*args, **kwargs)
+            return value
+
+        if cache.is_scalar:
+            @wraps(func)
+            def wrapper():
+                if self.tracer is not None:
+                    return self.tracer.call(cache, (), {})
+                value = scalar[0]
+                if value is _MISSING:
+                    value = scalar[0] = func()
+                return value
+        elif cache.has_variant:
+            default_variant = cache.default_variant
+
+            @wraps(func)
+            def wrapper(t, variant=_MISSING, **kwargs):
+                if kwargs:
+                    variant = cache.bind_variant(variant, kwargs)
+                elif variant is _MISSING:
+                    variant = default_variant
+                if self.tracer is not None:
+                    return self.tracer.call(cache, (t, variant), {})
+                row = rows.get(variant)
+                if row is not None and 0 <= t < len(row):
+                    value = row[t]
+                    if value is not _MISSING:
+                        return value
+                elif t < 0:
+                    return general(t, variant)
+                value = cache.row(variant, t)[t] = func(t, variant)
+                if self.sliding and lookback is not None:
+                    cache.evict(variant, t)
+                return value
+        elif cache.is_time_indexed:
+            row = cache.row(None)
+
+            @wraps(func)
+            def wrapper(t):
+                if self.tracer is not None:
+                    return self.tracer.call(cache, (t,), {})
+                if 0 <= t < len(row):
+                    value = row[t]
+                    if value is not _MISSING:
+                        return value
+                elif t < 0:
+                    return general(t)
+                value = cache.row(None, t)[t] = func(t)
+                if self.sliding and lookback is not None:
+                    cache.evict(None, t)
+                return value
+        else:
+            wrapper = wraps(func)(general)
+
+        cache.wrapper = wrapper
+        return wrapper
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from harness import run_isolated
+
+PERIOD_MONTHS = {"year": 12, "quarter": 3, "month": 1}
+PERIOD_ABBR = {"year": "yr", "quarter": "qtr", "month": "mth"}
+STUDY_START = np.datetime64("2006-06-15")
+STUDY_END = np.datetime64("2020-02-29")
+
+
+def ymd(dates):
+    """Year, month and day of ``datetime64[D]`` arrays."""
+    months = dates.astype("datetime64[M]")
+    year = months.astype("datetime64[Y]").astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (dates - months.astype("datetime64[D]")).astype(np.int64) + 1
+    return year, month, day
+
+
+def add_months(dates, months):
+    """``dates`` plus whole ``months``, rolled back to the month end like lubridate's ``%m+%``."""
+    start = dates.astype("datetime64[M]") + months
+    offset = (dates - dates.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64)
+    month_len = ((start + 1).astype("datetime64[D]") - start.astype("datetime64[D]")).astype(np.int64)
+    return start.astype("datetime64[D]") + np.minimum(offset, month_len - 1)
+
+
+def days_360(start, end):
+    """Days from ``start`` to ``end`` on the 30/360 bond basis."""
+    y1, m1, d1 = ymd(start)
+    y2, m2, d2 = ymd(end)
+    d1 = np.minimum(d1, 30)
+    d2 = np.where(d1 == 30, np.minimum(d2, 30), d2)
+    return 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+
+
+def load(path="../data/census_dat.csv"):
+    return pd.read_csv(path, parse_dates=["issue_date", "term_date"])
+
+
+def expose(census, start_date, end_date, target_status=(), cal_expo=False, expo_length="year",
+           default_status=None):
+    """Split census records into one exposure record per policy and period.
+
+    Follows actxps' ``expose``: policy periods (``cal_expo=False``) run from
+    each anniversary, calendar periods from the start of each calendar year,
+    quarter or month. Terminations after ``end_date`` are treated as active
+    with ``default_status``, by default the first status alphabetically.
+    Partial periods are exposed by their 30/360 fraction of the period, and
+    records terminating with a status in ``target_status`` get a full period
+    (the annual exposure method). A zero policy-period exposure becomes a full
+    period, as in actxps.
+    """
+    step = PERIOD_MONTHS[expo_length]
+    abbr = PERIOD_ABBR[expo_length]
+    start_date, end_date = np.datetime64(start_date, "D"), np.datetime64(end_date, "D")
+    if default_status is None:
+        default_status = np.sort(census["status"].unique())[0]
+
+    issue = census["issue_date"].to_numpy().astype("datetime64[D]")
+    term = census["term_date"].to_numpy().astype("datetime64[D]")
+    keep = (issue < end_date) & (np.isnat(term) | (term > start_date))
+    census, issue, term = census[keep], issue[keep], term[keep]
+    term = np.where(term > end_date, np.datetime64("NaT"), term)
+    status = np.where(np.isnat(term), default_status, census["status"].to_numpy())
+    last_date = np.where(np.isnat(term), end_date, term)
+
+    if cal_expo:
+        first_date = np.maximum(issue, start_date)
+        year, month, _ = ymd(first_date)
+        origin = (np.datetime64("1970-01", "M") + (year - 1970) * 12 + (month - 1) // step * step).astype("datetime64[D]")
+        y_last, m_last, _ = ymd(last_date)
+        months = (y_last - year) * 12 + (m_last - 1) // step * step - (month - 1) // step * step
+        n_periods = months // step + 1
+    else:
+        first_date = issue
+        origin = issue
+        y_issue, m_issue, _ = ymd(issue)
+        y_last, m_last, _ = ymd(last_date)
+        n_periods = ((y_last - y_issue) * 12 + m_last - m_issue) // step + 1
+        # the month count ignores the day of month, so step back where the last period starts too late
+        n_periods -= add_months(issue, (n_periods - 1) * step) > last_date
+
+    rows = np.repeat(np.arange(len(census)), n_periods)
+    period = np.arange(len(rows)) - np.repeat(np.cumsum(n_periods) - n_periods, n_periods) + 1
+    last_per = period == n_periods[rows]
+    period_start = add_months(origin[rows], (period - 1) * step)
+    next_start = add_months(origin[rows], period * step)
+    exposed_from = np.maximum(period_start, first_date[rows])
+    exposed_to = np.minimum(next_start, last_date[rows] + 1)
+    exposure = np.clip(days_360(exposed_from, exposed_to) / days_360(period_start, next_start), 0, 1)
+    status = np.where(last_per, status[rows], default_status)
+    exposure = np.where(last_per & np.isin(status, list(target_status)), 1.0, exposure)
+    if not cal_expo:
+        # 30/360 can round a final period of a day or exactly one period to 0, which actxps replaces with 1
+        exposure = np.where(exposure == 0, 1.0, exposure)
+
+    res = census.iloc[rows].reset_index(drop=True)
+    res["status"] = status
+    res["term_date"] = np.where(last_per, term[rows], np.datetime64("NaT"))
+    if cal_expo:
+        res[f"cal_{abbr}"] = period_start
+        res[f"cal_{abbr}_end"] = next_start - 1
+    else:
+        res[f"pol_{abbr}"] = period
+        res[f"pol_date_{abbr}"] = period_start
+        res[f"pol_date_{abbr}_end"] = next_start - 1
+    res["exposure"] = exposure
+    if not cal_expo:
+        res = res[(period_start >= start_date) & (period_start <= end_date)].reset_index(drop=True)
+    return res
+
+
+def expose_py(census, start_date, end_date, **kwargs):
+    return expose(census, start_date, end_date, cal_expo=False, expo_length="year", **kwargs)
+
+def expose_pq(census, start_date, end_date, **kwargs):
+    return expose(census, start_date, end_date, cal_expo=False, expo_length="quarter", **kwargs)
+
+def expose_pm(census, start_date, end_date, **kwargs):
+    return expose(census, start_date, end_date, cal_expo=False, expo_length="month", **kwargs)
+
+def expose_cy(census, start_date, end_date, **kwargs):
+    return expose(census, start_date, end_date, cal_expo=True, expo_length="year", **kwargs)
+
+def expose_cq(census, start_date, end_date, **kwargs):
+    return expose(census, start_date, end_date, cal_expo=True, expo_length="quarter", **kwargs)
+
+def expose_cm(census, start_date, end_date, **kwargs):
+    return expose(census, start_date, end_date, cal_expo=True, expo_length="month", **kwargs)
+
+
+def run(census):
+    return expose_py(census, STUDY_START, STUDY_END, target_status=["Surrender"])
+
+
+def run_num_rows(census):
+    return len(run(census))
+
+
+def run_exposure_benchmarks():
+    results = run_isolated("exposures", run="run_num_rows")
+    results["num_rows"] = results.pop("result")
+    return {
+        "Python NumPy exposures": results,
+    }
+
+if __name__ == "__main__":
+    results = run_exposure_benchmarks()
+    print(results)
@@ -0,0 +1,104 @@
+import numpy as np
+import resource
+import sys
+import tracemalloc
+from cash import nbytes
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from multiprocessing import get_context
+from timeit import default_timer
+
+
+def timed(func, *args):
+    start = default_timer()
+    value = func(*args)
+    return value, default_timer() - start
+
+
+def summarise(times):
+    """Statistics of run times given in seconds, in milliseconds."""
+    times = np.asarray(times) * 1000
+    return {
+        "minimum time ms": float(np.min(times)),
+        "median time ms": float(np.median(times)),
+        "p95 time ms": float(np.percentile(times, 95)),
+        "stddev time ms": float(np.std(times, ddof=1)) if len(times) > 1 else 0.0,
+    }
+
+
+def modelx_nbytes(space):
+    """Bytes of the values cached by the cells of a modelx model or space, and its subspaces."""
+    held = sum(nbytes(value) for cells in space.cells.values() for value in cells.values())
+    return held + sum(modelx_nbytes(child) for child in space.spaces.values())
+
+
+def torch_allocations(run, inputs):
+    """Number of CPU tensor allocations made by ``run(inputs)``."""
+    from torch.profiler import profile, ProfilerActivity
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        run(inputs)
+    return sum(1 for event in prof.events() if event.cpu_memory_usage > 0)
+
+
+def memory(model, run, inputs):
+    """Memory use of one ``run(inputs)`` and of the caches it leaves behind.
+
+    NumPy has no Python hook that counts allocations, so for NumPy the count
+    is of array buffers still held after the run, from tracemalloc's NumPy
+    domain. Torch allocations are counted with the torch profiler.
+    """
+    tracemalloc.start()
+    try:
+        run(inputs)
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    numpy_buffers = snapshot.filter_traces([tracemalloc.DomainFilter(True, np.lib.tracemalloc_domain)])
+    results = {
+        "peak rss MB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "tracemalloc peak bytes": peak,
+        "numpy arrays held": len(numpy_buffers.traces),
+    }
+    if hasattr(model, "cash"):
+        results["cache bytes"] = model.cash.nbytes()
+    elif hasattr(inputs, "spaces"): # a modelx model
+        results["cache bytes"] = modelx_nbytes(inputs)
+    if "torch" in sys.modules:
+        results["torch allocations"] = torch_allocations(run, inputs)
+    return results
+
+
+def benchmark(module, run="run", min_trials=5, max_trials=100, min_time=1.0, profile=False):
+    """Benchmark ``load()`` and ``run(inputs)`` of the model ``module`` in this process.
+
+    After a warm-up run, runs are repeated until at least ``min_trials`` ran
+    and they took ``min_time`` seconds in total, or ``max_trials`` ran. Memory
+    use is measured by ``memory`` on further runs. With ``profile`` the
+    module's ``Cash`` also reports its hot formulas.
+    """
+    model = import_module(module)
+    run = getattr(model, run)
+    inputs, load_time = timed(model.load)
+    result, warm_up_time = timed(run, inputs)
+    times = []
+    while len(times) < max_trials and (len(times) < min_trials or sum(times) < min_time):
+        times.append(timed(run, inputs)[1])
+    results = {
+        "result": result,
+        "trials": len(times),
+        "load time ms": load_time * 1000,
+        "warm-up time ms": warm_up_time * 1000,
+        **summarise(times),
+        **memory(model, run, inputs),
+    }
+    if profile:
+        model.cash.profile(run, inputs)
+        results["hot formulas"] = model.cash.report(top=5)
+    return results
+
+
+def run_isolated(module, run="run", **kwargs):
+    """``benchmark`` in a fresh interpreter, so imports and caches are not shared."""
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(benchmark, module, run, **kwargs).result()
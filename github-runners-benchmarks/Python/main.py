@@ -2,15 +2,19 @@ from mortality import run_mortality_benchmarks
 from basicterm_m import run_basic_term_benchmarks
 from savings_me import run_savings_benchmarks
 from basicterm_me import run_basic_term_me_benchmarks
+from exposures import run_exposure_benchmarks
+from sharded import run_sharded_benchmarks
 import yaml
 
 
 def get_results():
     return {
         "mortality": run_mortality_benchmarks(),
+        "exposures": run_exposure_benchmarks(),
         "basic_term_benchmark": run_basic_term_benchmarks(),
         "basic_term_me_benchmark": run_basic_term_me_benchmarks(),
         "savings_benchmark": run_savings_benchmarks(),
+        "sharded_benchmark": run_sharded_benchmarks(),
     }
 
 
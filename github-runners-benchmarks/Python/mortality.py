@@ -1,53 +1,145 @@
 from pymort.XML import MortXML
+import hashlib
 import numpy as np
-import timeit
+import pandas as pd
+import os
+import tempfile
+from harness import run_isolated
 
-def get_select():
+TABLE_IDS = range(3299, 3309)
+STORE_DIR = "_mort_tables"
+
+def get_select(ids=TABLE_IDS):
     return np.array(
-        [MortXML(id).Tables[0].Values.unstack().values for id in range(3299, 3309)]
+        [MortXML(id).Tables[0].Values.unstack().values for id in ids]
     )
 
-def get_ultimate():
+def get_ultimate(ids=TABLE_IDS):
     return np.array(
-        [MortXML(id).Tables[1].Values.unstack().values for id in range(3299, 3309)]
+        [MortXML(id).Tables[1].Values.unstack().values for id in ids]
     )
 
-def mortality1(select = get_select(), ultimate = get_ultimate()):
-    mortality_table_index = np.arange(10)
-    duration = np.arange(25)
-    issue_age = np.arange(18, 51)
-    mortality_table_index, duration, issue_age = [
-        x.flatten() for x in np.meshgrid(mortality_table_index, duration, issue_age)
-    ]
-    time_axis = np.arange(30)[:, None]
-    duration_projected = time_axis + duration
-    q = np.where(
-        duration_projected < select.shape[-1],
-        select[
-            mortality_table_index,
-            issue_age - 18,
-            np.minimum(duration_projected, select.shape[-1] - 1),
-        ],  # np.minimum avoids some out of bounds error (JAX clips out of bounds indexes so no problem if using JAX)
-        ultimate[mortality_table_index, issue_age - 18 + duration_projected],
-    )
-    npx = np.concatenate(
-        [np.ones((1, q.shape[1])), np.cumprod(1 - q, axis=0)[:-1]], axis=0
+def store_path(kind, ids, directory=STORE_DIR):
+    return os.path.join(directory, f"{kind}-{'-'.join(str(id) for id in ids)}.npy")
+
+def save_array(path, values):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, staging = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npy")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, values)
+    os.replace(staging, path)
+
+def load_tables(ids=TABLE_IDS, directory=STORE_DIR):
+    """Select (table x issue age x duration) and ultimate (table x age) rates.
+
+    The XML tables are parsed with pymort once and stored as ``.npy`` files in
+    ``directory``; later calls memory-map them instead of parsing.
+    """
+    ids = list(ids)
+    tables = {}
+    for kind, parse in (("select", get_select), ("ultimate", get_ultimate)):
+        path = store_path(kind, ids, directory)
+        if not os.path.exists(path):
+            save_array(path, parse(ids))
+        tables[kind] = np.load(path, mmap_mode="r")
+    return tables
+
+class MortalityBasis:
+    """Gather indices of a select and ultimate table set, for a grid of cells.
+
+    Cells are (table, issue age, duration) at the start of the projection, with
+    consecutive ``durations``. The rate of a cell in projection year ``t`` only
+    depends on its duration plus ``t``, so the rates of every (table, issue age,
+    projected duration) are one ``np.take`` from the flattened select and
+    ultimate rates, and each projection year is a sliding-window view of them.
+    """
+    def __init__(self, select, ultimate, tables=range(10), issue_ages=range(18, 51), durations=range(25),
+                 horizon=30, min_age=18):
+        self.tables, self.issue_ages, self.durations = np.array(tables), np.array(issue_ages), np.array(durations)
+        max_horizon = ultimate.shape[-1] - (self.issue_ages.max() - min_age + self.durations.max())
+        if not 1 <= horizon <= max_horizon:
+            raise ValueError(f"horizon must be between 1 and {max_horizon} years, the last age of the ultimate "
+                             f"table for issue age {self.issue_ages.max()} and duration {self.durations.max()}, got {horizon}")
+        self.horizon = horizon
+        projected = np.arange(self.durations[0], self.durations[-1] + horizon)
+        table, issue_age, duration = np.meshgrid(self.tables, self.issue_ages, projected, indexing="ij")
+        select_period = select.shape[-1]
+        select_index = np.ravel_multi_index(
+            (table, issue_age - min_age, np.minimum(duration, select_period - 1)), select.shape)
+        ultimate_index = select.size + np.ravel_multi_index((table, issue_age - min_age + duration), ultimate.shape)
+        self.index = np.where(duration < select_period, select_index, ultimate_index)
+        self.rates = np.concatenate([np.ravel(select), np.ravel(ultimate)])
+        self.shape = (len(self.tables), len(self.issue_ages), len(self.durations))
+        self._q = np.empty(self.index.shape)
+        self._survival = np.empty(self.shape)
+        self._deaths = np.empty((horizon, *self.shape))
+
+    def deaths(self):
+        """Probability of dying in each projection year, like ``npx * q``, of shape (horizon, cells).
+
+        The result is a buffer overwritten by the next call.
+        """
+        q = np.take(self.rates, self.index, out=self._q)
+        q_by_year = np.lib.stride_tricks.sliding_window_view(q, len(self.durations), axis=-1)
+        survival = self._survival
+        survival.fill(1)
+        for t in range(self.horizon):
+            np.multiply(survival, q_by_year[:, :, t], out=self._deaths[t])
+            survival -= self._deaths[t]
+        return self._deaths.reshape(self.horizon, -1)
+
+    def pv_unit_claims(self, rate=0.02, deaths=None):
+        """PV of a unit claim paid at the end of the year of death, by cell.
+
+        Pass ``deaths`` from ``deaths()`` to value several rates without redoing the projection.
+        """
+        deaths = self.deaths() if deaths is None else deaths
+        return (1 + rate) ** -np.arange(1, len(deaths) + 1) @ deaths
+
+_bases = {}
+
+def basis(select, ultimate, horizon=30):
+    """The default grid ``MortalityBasis`` of a table set, built once per distinct tables and horizon."""
+    key = (hashlib.sha1(np.ascontiguousarray(select).tobytes() + np.ascontiguousarray(ultimate).tobytes()).hexdigest(), horizon)
+    if key not in _bases:
+        _bases[key] = MortalityBasis(select, ultimate, horizon=horizon)
+    return _bases[key]
+
+def pv_unit_claims_grid(select, ultimate, rates, horizons=(30,), ids=TABLE_IDS):
+    """PV of unit claims of every cell for every interest rate and horizon in years.
+
+    Survivorship is projected once to the longest horizon, and the discount
+    factors of every (rate, horizon), zero beyond the horizon, are applied in
+    one matrix product. Returns a series indexed by rate, horizon, table id,
+    issue age and duration. Rates and horizons must be distinct, and
+    horizons must stay within the ultimate table.
+    """
+    rates, horizons = np.atleast_1d(rates).astype(np.float64), np.atleast_1d(horizons)
+    for name, values in (("rates", rates), ("horizons", horizons)):
+        if len(np.unique(values)) != len(values):
+            raise ValueError(f"{name} must be distinct, got {values.tolist()}")
+    grid = basis(select, ultimate, int(horizons.max()))
+    t = np.arange(1, grid.horizon + 1)
+    discount = (1 + rates[:, None, None]) ** -t * (t <= horizons[:, None])
+    pv = discount.reshape(-1, grid.horizon) @ grid.deaths()
+    index = pd.MultiIndex.from_product(
+        [rates, horizons, np.asarray(ids)[grid.tables], grid.issue_ages, grid.durations],
+        names=["rate", "horizon", "table", "issue_age", "duration"],
     )
-    v = 1 / 1.02
-    v_eoy = v ** np.arange(1, 31)[:, None]
-    unit_claims_discounted = npx * q * v_eoy
-    return np.sum(unit_claims_discounted)
+    return pd.Series(pv.ravel(), index=index, name="pv_unit_claims")
+
+def mortality1(select, ultimate):
+    return np.sum(basis(select, ultimate).pv_unit_claims(0.02))
+
+def load():
+    return load_tables()
+
+def run(inputs):
+    return float(mortality1(**inputs))
 
 def run_mortality_benchmarks():
-    select, ultimate = get_select(), get_ultimate()
-    mort1_result = mortality1(select, ultimate)
-    trials = 20
-    b1 = timeit.repeat(stmt="mortality1(select, ultimate)", setup="from mortality import mortality1", globals = {"select": select, "ultimate": ultimate}, number=1, repeat=trials)
     return {
-        "Python PyMort": {
-            "result": float(mort1_result),
-            "minimum time": f"{np.min(b1)*1000} milliseconds",
-        }
+        "Python PyMort": run_isolated("mortality"),
     }
 
 if __name__ == "__main__":
@@ -1,24 +1,12 @@
-import numpy as np
-import timeit
-from savings_me_lifelib import savings_me_lifelib
-from savings_me_recursive_numpy import savings_me_recursive_numpy
+from harness import run_isolated
 from pprint import pprint
 
 def run_savings_benchmarks():
-    trials = 5
-    modelx_time = timeit.repeat(stmt="savings_me_lifelib()", setup="from savings_me_lifelib import savings_me_lifelib", number=1, repeat=trials)
-    modelx_result = savings_me_lifelib()
-    recursive_numpy_time = timeit.repeat(stmt="savings_me_recursive_numpy()", setup="from savings_me_recursive_numpy import savings_me_recursive_numpy", number=1, repeat=trials)
-    recursive_numpy_result = savings_me_recursive_numpy()
     return {
-        "Python lifelib cashvalue_me_ex4": {
-            "minimum time": f"{np.min(modelx_time)*1000} milliseconds",
-            "result": modelx_result,
-        },
-        "Python recursive numpy cashvalue_me_ex4": {
-            "minimum time": f"{np.min(recursive_numpy_time)*1000} milliseconds",
-            "result": recursive_numpy_result,
-        }
+        "Python lifelib cashvalue_me_ex4": run_isolated("savings_me_lifelib"),
+        "Python recursive numpy cashvalue_me_ex4": run_isolated("savings_me_recursive_numpy", profile=True),
+        # 100 scenarios take about 3.4 s per run, so fewer trials
+        "Python scenarios numpy cashvalue_me_ex4": run_isolated("savings_me_scenarios_numpy", min_trials=2),
     }
 
 if __name__ == "__main__":
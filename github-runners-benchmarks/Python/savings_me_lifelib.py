@@ -1,15 +1,22 @@
 import modelx as mx
 import numpy as np
-import timeit
 import pandas as pd
-from os.path import dirname, join
+from os.path import join
 
-m = mx.read_model("CashValue_ME_EX4")
-model_file = join(dirname(__file__), "CashValue_ME_EX4", "model_point_table_10K.csv")
-m.Projection.model_point_table = pd.read_csv(model_file)
-m.Projection.scen_size = 1
-print(m.Projection.max_proj_len())
+def load(data_dir="CashValue_ME_EX4"):
+    m = mx.read_model(data_dir)
+    m.Projection.model_point_table = pd.read_csv(join(data_dir, "model_point_table_10K.csv"))
+    m.Projection.scen_size = 1
+    return m
 
-def savings_me_lifelib():
+def run(m):
     m.Projection.clear_cache = 1
     return float(np.sum(m.Projection.pv_net_cf()))
+
+def savings_me_lifelib():
+    return run(load())
+
+if __name__ == "__main__":
+    m = load()
+    print(m.Projection.max_proj_len())
+    print(run(m))
@@ -1,47 +1,82 @@
-from collections import defaultdict
-from functools import wraps
 import pandas as pd
 import numpy as np
-
-class Cash:
-    def __init__(self):
-        self.reset()
-
-    def reset(self):
-        self.caches = defaultdict(dict)
-
-    def __call__(self, func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            key = (args, frozenset(kwargs.items()))
-            if key not in self.caches[func.__name__]:
-                self.caches[func.__name__][key] = func(*args, **kwargs)
-            return self.caches[func.__name__][key]
-
-        return wrapper
+from cash import Cash
+from curves import curve as make_curve
+from xlsx_cache import read_excel
+from os.path import join
 
 cash = Cash()
 
-disc_rate_ann = np.array(pd.read_excel("./CashValue_ME_EX4/disc_rate_ann.xlsx")["zero_spot"])
-disc_rate_arr = np.concatenate([[1], np.cumprod((1+np.repeat(disc_rate_ann, 12)) ** (-1/12))])
-mort_table = pd.read_excel("./CashValue_ME_EX4/mort_table.xlsx")
-surr_charge_table = pd.read_excel("./CashValue_ME_EX4/surr_charge_table.xlsx")
-product_spec_table = pd.read_excel("./CashValue_ME_EX4/product_spec_table.xlsx")
-model_point_table = pd.read_csv("./CashValue_ME_EX4/model_point_table_10K.csv")
-model_point_table_ext = model_point_table.merge(product_spec_table, on='spec_id')
-model_point_moneyness = pd.read_excel("./CashValue_ME_EX4/model_point_moneyness.xlsx")
 scen_id = 1
 scen_size = 1
+SURR_CHARGE_MATRIX_BYTES = 256 << 20
+
+class ModelPoints:
+    """Model-point columns as contiguous arrays, one row per policy and scenario.
+
+    Categorical columns are stored as integer codes into ``categories[name]``,
+    so formulas compare small integers rather than strings.
+    """
+    CATEGORICAL = ["spec_id", "sex", "premium_type", "surr_charge_id"]
+
+    def __init__(self, table: pd.DataFrame, scen_index: pd.Index):
+        self.table_index = table.index
+        self.scen_index = scen_index
+        self.categories = {}
+        for name in table.columns:
+            values = table[name]
+            if name in self.CATEGORICAL:
+                codes, categories = pd.factorize(values.astype(str))
+                self.categories[name] = categories.to_numpy()
+                values = codes
+            setattr(self, name, np.ascontiguousarray(np.repeat(np.asarray(values), len(scen_index))))
+        self.size = len(table) * len(scen_index)
+
+    def code(self, name, value):
+        """Integer code of ``value`` in the categorical column ``name``, -1 if absent."""
+        matches = np.flatnonzero(self.categories[name] == value)
+        return matches[0] if len(matches) else -1
+
+    @property
+    def index(self):
+        return pd.MultiIndex.from_product(
+            [self.table_index, self.scen_index],
+            names=self.table_index.names + self.scen_index.names,
+        )
 
-@cash
+# inputs, set by use()
+disc_rate_ann = disc_rate_arr = mort_table = surr_charge_table = product_spec_table = None
+model_point_table = model_point_table_ext = model_point_moneyness = None
+
+def load(data_dir="CashValue_ME_EX4"):
+    """Model points and assumptions in ``data_dir``, as read by ``use``."""
+    disc_rate_ann = np.array(read_excel(join(data_dir, "disc_rate_ann.xlsx"))["zero_spot"])
+    model_point_table = pd.read_csv(join(data_dir, "model_point_table_10K.csv"))
+    product_spec_table = read_excel(join(data_dir, "product_spec_table.xlsx"))
+    return {
+        "disc_rate_ann": disc_rate_ann,
+        "disc_rate_arr": make_curve(disc_rate_ann, inflation_rate(), 12 * len(disc_rate_ann) + 1).accumulated_discount,
+        "mort_table": read_excel(join(data_dir, "mort_table.xlsx")),
+        "surr_charge_table": read_excel(join(data_dir, "surr_charge_table.xlsx")),
+        "product_spec_table": product_spec_table,
+        "model_point_table": model_point_table,
+        "model_point_table_ext": model_point_table.merge(product_spec_table, on='spec_id'),
+        "model_point_moneyness": read_excel(join(data_dir, "model_point_moneyness.xlsx")),
+    }
+
+def use(inputs):
+    """Point the formulas at ``inputs`` returned by ``load``."""
+    globals().update(inputs)
+
+@cash(lookback=0)
 def age(t):
     return age_at_entry() + duration(t)
 
 @cash
 def age_at_entry():
-    return model_point()["age_at_entry"].values
+    return model_point().age_at_entry
 
-@cash
+@cash(lookback=1)
 def av_at(t, timing):
     if timing == "BEF_MAT":
         return av_pp_at(t, "BEF_PREM") * pols_if_at(t, "BEF_MAT")
@@ -52,11 +87,11 @@ def av_at(t, timing):
     else:
         raise ValueError("invalid timing")
     
-@cash
+@cash(lookback=0)
 def av_change(t):
     return av_at(t+1, 'BEF_MAT') - av_at(t, 'BEF_MAT')
 
-@cash
+@cash(lookback=1)
 def av_pp_at(t, timing):
     if timing == "BEF_PREM":
         if t == 0:
@@ -74,9 +109,9 @@ def av_pp_at(t, timing):
     
 @cash
 def av_pp_init():
-    return model_point()["av_pp_init"].values
+    return model_point().av_pp_init
 
-@cash
+@cash(lookback=0)
 def claim_net_pp(t, kind):
     if kind == "DEATH":
         return claim_pp(t, "DEATH") - av_pp_at(t, "MID_MTH")
@@ -87,7 +122,7 @@ def claim_net_pp(t, kind):
     else:
         raise ValueError("invalid kind")
     
-@cash
+@cash(lookback=0)
 def claim_pp(t, kind):
     if kind == "DEATH":
         return np.maximum(sum_assured(), av_pp_at(t, "MID_MTH"))
@@ -98,7 +133,7 @@ def claim_pp(t, kind):
     else:
         raise ValueError("invalid kind")
 
-@cash
+@cash(lookback=0)
 def claims(t, kind=None):
     if kind == "DEATH":
         return claim_pp(t, "DEATH") * pols_death(t)
@@ -111,7 +146,7 @@ def claims(t, kind=None):
     else:
         raise ValueError("invalid kind")
 
-@cash
+@cash(lookback=0)
 def claims_from_av(t, kind):
     if kind == "DEATH":
         return av_pp_at(t, "MID_MTH") * pols_death(t)
@@ -122,38 +157,42 @@ def claims_from_av(t, kind):
     else:
         raise ValueError("invalid kind")
 
-@cash
+@cash(lookback=0)
 def claims_over_av(t, kind):
     return claims(t, kind) - claims_from_av(t, kind)
 
-@cash
+@cash(lookback=0)
 def coi(t):
     return coi_pp(t) * pols_if_at(t, "BEF_DECR")
 
-@cash
+@cash(lookback=0)
 def coi_pp(t):
     return coi_rate(t) * net_amt_at_risk(t)
 
-@cash
+@cash(lookback=0)
 def coi_rate(t):
     return 0    #1.1 * mort_rate_mth(t)
 
-@cash
+@cash(lookback=0)
 def commissions(t):
     return 0.05 * premiums(t)
 
+@cash
+def curve():
+    return make_curve(disc_rate_ann, inflation_rate(), len(disc_rate_arr))
+
 @cash
 def disc_factors():
     return disc_rate_arr[:max_proj_len()]
 
-@cash
+@cash(lookback=0)
 def duration(t):
     return duration_mth(t) // 12
 
-@cash
+@cash(lookback=1)
 def duration_mth(t):
     if t == 0:
-        return model_point()['duration_mth'].values
+        return model_point().duration_mth
     else:
         return duration_mth(t-1) + 1
 
@@ -165,63 +204,70 @@ def expense_acq():
 def expense_maint():
     return 500
 
-@cash
+@cash(lookback=0)
 def expenses(t):
     return expense_acq() * pols_new_biz(t) \
         + pols_if_at(t, "BEF_DECR") * expense_maint()/12 * inflation_factor(t)
 
 @cash
 def has_surr_charge():
-    return model_point()['has_surr_charge'].values
+    return model_point().has_surr_charge
 
-@cash
+@cash(lookback=0)
 def inflation_factor(t):
-    return (1 + inflation_rate())**(t/12)
+    return curve().inflation_factor[t]
 
 @cash
 def inflation_rate():
     return 0.01
 
-@cash
+@cash(lookback=0)
 def inv_income(t):
     return (inv_income_pp(t) * pols_if_at(t+1, "BEF_MAT")
             + 0.5 * inv_income_pp(t) * (pols_death(t) + pols_lapse(t)))
 
-@cash
+@cash(lookback=1)
 def inv_income_pp(t):
     return inv_return_mth(t) * av_pp_at(t, "BEF_INV")
 
-@cash
+@cash(lookback=0)
 def inv_return_mth(t):
     return inv_return_table()[:, t]
 
 @cash
-def inv_return_table():
+def inv_return_scen():
+    """Monthly investment returns by scenario (rows) and t (columns)."""
     mu = 0.02
     sigma = 0.03
     dt = 1/12
 
-    return np.tile(np.exp(
-        (mu - 0.5 * sigma**2) * dt + sigma * dt**0.5 * std_norm_rand()) - 1,
-        (point_size(), 1))
+    return np.exp((mu - 0.5 * sigma**2) * dt + sigma * dt**0.5 * std_norm_rand()) - 1
 
 @cash
-def is_wl():
-    return model_point()['is_wl'].values
+def inv_return_table():
+    return np.tile(inv_return_scen(), (point_size(), 1))
 
 @cash
+def is_wl():
+    return model_point().is_wl
+
+@cash(lookback=0)
 def lapse_rate(t):
     return 0
 
+@cash(lookback=0)
+def lapse_rate_mth(t):
+    return 1-(1 - lapse_rate(t))**(1/12)
+
 @cash
 def load_prem_rate():
-    return model_point()['load_prem_rate'].values
+    return model_point().load_prem_rate
 
-@cash
+@cash(lookback=0)
 def maint_fee(t):
     return maint_fee_pp(t) * pols_if_at(t, "BEF_DECR")
 
-@cash
+@cash(lookback=0)
 def maint_fee_pp(t):
     return maint_fee_rate() * av_pp_at(t, "BEF_FEE")
 
@@ -229,7 +275,7 @@ def maint_fee_pp(t):
 def maint_fee_rate():
     return 0    # 0.01 / 12
 
-@cash
+@cash(lookback=0)
 def margin_expense(t):
     return (load_prem_rate()* premium_pp(t) * pols_if_at(t, "BEF_DECR")
             + surr_charge(t)
@@ -237,7 +283,7 @@ def margin_expense(t):
             - commissions(t)
             - expenses(t))
 
-@cash
+@cash(lookback=0)
 def margin_mortality(t):
     return coi(t) - claims_over_av(t, 'DEATH')
 
@@ -247,26 +293,13 @@ def max_proj_len():
 
 @cash
 def model_point():
-    mps = model_point_table_ext
+    return ModelPoints(model_point_table_ext, scen_index())
 
-    idx = pd.MultiIndex.from_product(
-            [mps.index, scen_index()],
-            names = mps.index.names + scen_index().names
-            )
-
-    res = pd.DataFrame(
-            np.repeat(mps.values, len(scen_index()), axis=0),
-            index=idx,
-            columns=mps.columns
-        )
-
-    return res.astype(mps.dtypes)
-
-@cash
+@cash(lookback=0)
 def mort_rate(t):
-    return np.zeros(len(model_point().index))
+    return np.zeros(model_point().size)
 
-@cash
+@cash(lookback=0)
 def mort_rate_mth(t):
     return 1-(1- mort_rate(t))**(1/12)
 
@@ -284,11 +317,11 @@ def mort_table_reindexed():
 
     return pd.concat(result)
 
-@cash
+@cash(lookback=0)
 def net_amt_at_risk(t):
     return np.maximum(sum_assured() - av_pp_at(t, 'BEF_FEE'), 0)
 
-@cash
+@cash(lookback=0)
 def net_cf(t):
     return (premiums(t)
             + inv_income(t) - claims(t) - expenses(t) - commissions(t) - av_change(t))
@@ -296,17 +329,17 @@ def net_cf(t):
 @cash
 def policy_term():
     return (is_wl() * (mort_table_last_age() - age_at_entry()) 
-            + (is_wl() == False) * model_point()["policy_term"].values)
+            + (is_wl() == False) * model_point().policy_term)
 
-@cash
+@cash(lookback=1)
 def pols_death(t):
     return pols_if_at(t, "BEF_DECR") * mort_rate_mth(t)
 
-@cash
+@cash(lookback=0)
 def pols_if(t):
     return pols_if_at(t, "BEF_MAT")
 
-@cash
+@cash(lookback=1)
 def pols_if_at(t, timing):
     if timing == "BEF_MAT":
         if t == 0:
@@ -322,38 +355,46 @@ def pols_if_at(t, timing):
 
 @cash
 def pols_if_init():
-    return model_point()["policy_count"].where(duration_mth(0) > 0, other=0).values
+    return np.where(duration_mth(0) > 0, model_point().policy_count, 0)
 
-@cash
+@cash(lookback=1)
 def pols_lapse(t):
-    return (pols_if_at(t, "BEF_DECR") - pols_death(t)) * (1-(1 - lapse_rate(t))**(1/12))
+    return (pols_if_at(t, "BEF_DECR") - pols_death(t)) * lapse_rate_mth(t)
 
-@cash
+@cash(lookback=0)
 def pols_maturity(t):
     return (duration_mth(t) == policy_term() * 12) * pols_if_at(t, "BEF_MAT")
 
-@cash
+@cash(lookback=0)
 def pols_new_biz(t):
-    return model_point()['policy_count'].values * (duration_mth(t) == 0)
+    return model_point().policy_count * (duration_mth(t) == 0)
 
-@cash
+@cash(lookback=0)
 def prem_to_av(t):
     return  prem_to_av_pp(t) * pols_if_at(t, "BEF_DECR")
 
-@cash
+@cash(lookback=0)
 def prem_to_av_pp(t):
     return (1 - load_prem_rate()) * premium_pp(t)
 
-@cash
+@cash(lookback=0)
 def premium_pp(t):
-    return model_point()['premium_pp'].values * ((premium_type() == 'SINGLE') & (duration_mth(t) == 0) |
-                                                 (premium_type() == 'LEVEL') & (duration_mth(t) < 12 * policy_term()))
+    return model_point().premium_pp * (is_single_premium() & (duration_mth(t) == 0) |
+                                       is_level_premium() & (duration_mth(t) < 12 * policy_term()))
 
 @cash
 def premium_type():
-    return model_point()['premium_type'].values
+    return model_point().premium_type # codes of model_point().categories["premium_type"]
+
+@cash
+def is_single_premium():
+    return premium_type() == model_point().code("premium_type", "SINGLE")
 
 @cash
+def is_level_premium():
+    return premium_type() == model_point().code("premium_type", "LEVEL")
+
+@cash(lookback=0)
 def premiums(t):
     return premium_pp(t) * pols_if_at(t, "BEF_DECR")
 
@@ -417,10 +458,6 @@ def result_pv():
 def scen_index():
     return pd.Index(range(1, scen_size + 1), name='scen_id')
 
-@cash
-def sex():
-    return model_point()["sex"].values
-
 @cash
 def std_norm_rand():
     if hasattr(np.random, 'default_rng'):
@@ -433,28 +470,40 @@ def std_norm_rand():
 
 @cash
 def sum_assured():
-    return model_point()['sum_assured'].values
+    return model_point().sum_assured
 
-@cash
+@cash(lookback=0)
 def surr_charge(t):
     return surr_charge_rate(t) * av_pp_at(t, "MID_MTH") * pols_lapse(t)
 
-@cash
-def surr_charge_id():
-    return model_point()['surr_charge_id'].values.astype(str)
-
 @cash
 def surr_charge_max_idx():
     return max(surr_charge_table.index)
 
-@cash
+@cash(lookback=0)
 def surr_charge_rate(t):
-    ind_row = np.minimum(duration(t), surr_charge_max_idx())
-    return surr_charge_table.values.flat[surr_charge_table_column() + ind_row * len(surr_charge_table.columns)]
+    matrix = surr_charge_rate_matrix()
+    if matrix is not None:
+        return matrix[t]
+    return surr_charge_rates()[model_point().surr_charge_id, np.minimum(duration(t), surr_charge_max_idx())]
+
+@cash
+def surr_charge_rates():
+    """Surrender charge rates by surr_charge_id code (rows) and duration (columns)."""
+    columns = surr_charge_table.columns.searchsorted(model_point().categories["surr_charge_id"], side='right') - 1
+    return np.ascontiguousarray(surr_charge_table.values[:, columns].T)
 
 @cash
-def surr_charge_table_column():
-    return surr_charge_table.columns.searchsorted(surr_charge_id(), side='right') - 1
+def surr_charge_rate_matrix():
+    """Surrender charge rates of every (t, policy) in one gather.
+
+    None above ``SURR_CHARGE_MATRIX_BYTES`` or in sliding mode, where memory
+    must not grow with the projection length.
+    """
+    if cash.sliding or max_proj_len() * model_point().size * 8 > SURR_CHARGE_MATRIX_BYTES:
+        return None
+    duration = (model_point().duration_mth + np.arange(max_proj_len())[:, None]) // 12
+    return surr_charge_rates()[model_point().surr_charge_id, np.minimum(duration, surr_charge_max_idx())]
 
 @cash
 def surr_charge_table_stacked():
@@ -464,9 +513,44 @@ def surr_charge_table_stacked():
 def point_size():
     return len(model_point_table_ext)
 
-def savings_me_recursive_numpy():
+def accumulate_pvs():
+    """Fill the PV formulas in a single forward pass over t.
+
+    With ``cash.reset(sliding=True)`` each time step can be evicted as soon as
+    the next one is computed, so memory does not grow with the projection length.
+    """
+    pvs = {pv_premiums: 0, pv_inv_income: 0, pv_claims: 0, pv_expenses: 0, pv_commissions: 0, pv_av_change: 0}
+    cfs = {pv_premiums: premiums, pv_inv_income: inv_income, pv_claims: claims,
+           pv_expenses: expenses, pv_commissions: commissions, pv_av_change: av_change}
+    for t in range(max_proj_len()):
+        for pv, cf in cfs.items():
+            pvs[pv] = pvs[pv] + cf(t) * disc_rate_arr[t]
+    for pv, value in pvs.items():
+        cash.put(pv, value)
+
+def run(inputs):
+    use(inputs)
     cash.reset() # Ensure the cache is clear before running calculations
     return float(np.sum(pv_net_cf()))
 
+def run_sliding(inputs):
+    use(inputs)
+    cash.reset(sliding=True)
+    accumulate_pvs()
+    return float(np.sum(pv_net_cf()))
+
+def run_replay(inputs):
+    # not benchmarked: the formulas recurse at most 10 deep, so replay has no recursion to save,
+    # and computing every formula one time step at a time over the full cache is slower than run
+    use(inputs)
+    if cash.schedule is None:
+        cash.record(pv_net_cf) # warm-up run records the dependency graph
+    cash.reset()
+    cash.replay()
+    return float(np.sum(pv_net_cf()))
+
+def savings_me_recursive_numpy():
+    return run(load())
+
 if __name__ == "__main__":
-    print(savings_me_recursive_numpy())
\ No newline at end of file
+    print(savings_me_recursive_numpy())
@@ -0,0 +1,98 @@
+import numpy as np
+import savings_me_recursive_numpy as savings
+
+SCEN_SIZE = 100 # time grows linearly, about 33 ms a scenario
+BATCH_ELEMENTS = 1 << 20 # scenarios x policies held per step
+
+
+def load(data_dir="CashValue_ME_EX4", scen_size=SCEN_SIZE):
+    return {**savings.load(data_dir), "scen_size": scen_size}
+
+
+def inv_return_scen(scen_size):
+    """The recursive model's monthly returns of shape (scenarios, t), shared by all policies.
+
+    The draws do not depend on ``scen_size``, so scenario 1 is the same for any ``scen_size``.
+    """
+    savings.use({"scen_size": scen_size})
+    savings.cash.reset()
+    try:
+        return savings.inv_return_scen()
+    finally:
+        savings.use({"scen_size": 1})
+        savings.cash.reset()
+
+
+def project_batch(inv_return):
+    """Total PV of net cash flows for each row of ``inv_return``, the (scenarios, t) returns.
+
+    Policy counts, premiums, expenses and every rate are the recursive
+    model's formulas, evaluated once per policy as it must be used with
+    ``scen_size`` 1. None of them depends on the scenario, so only the
+    account values are projected as (scenarios, policies). The formulas run
+    in sliding mode, so they hold a few time steps of (policies,) vectors.
+    """
+    savings.cash.reset(sliding=True)
+    sum_assured = savings.sum_assured().astype(np.float64)
+    av_pp = np.broadcast_to(savings.av_pp_init(), (len(inv_return), len(sum_assured))).astype(np.float64) # before premium
+    inv_income_pp, av_mid_mth, work = np.empty_like(av_pp), np.empty_like(av_pp), np.empty_like(av_pp)
+    pv = np.zeros(len(inv_return))
+    for t in range(savings.max_proj_len()):
+        # counts are integer until a decrement applies, and matmul only uses BLAS for matching dtypes
+        pols_if_bef_mat, pols_maturity, pols_death, pols_lapse, pols_if_next = (np.asarray(pols, dtype=np.float64) for pols in (
+            savings.pols_if_at(t, "BEF_MAT"), savings.pols_maturity(t), savings.pols_death(t), savings.pols_lapse(t),
+            savings.pols_if_at(t+1, "BEF_MAT"),
+        ))
+
+        av_at_bef_mat = av_pp @ pols_if_bef_mat
+        claims = np.maximum(sum_assured, av_pp, out=work) @ pols_maturity
+        av_pp += savings.prem_to_av_pp(t) # before fee
+        maint_fee_rate, coi_rate = savings.maint_fee_rate(), savings.coi_rate(t)
+        if np.any(maint_fee_rate) or np.any(coi_rate):
+            np.subtract(sum_assured, av_pp, out=work)
+            np.maximum(work, 0, out=work) # net amount at risk
+            work *= coi_rate
+            av_pp -= np.multiply(maint_fee_rate, av_pp, out=inv_income_pp)
+            av_pp -= work # before investment
+        np.multiply(inv_return[:, t, None], av_pp, out=inv_income_pp)
+        np.multiply(inv_income_pp, 0.5, out=av_mid_mth)
+        av_mid_mth += av_pp
+        claims += np.maximum(sum_assured, av_mid_mth, out=work) @ pols_death
+        claims += np.multiply(av_mid_mth, 1 - savings.surr_charge_rate(t), out=work) @ pols_lapse # net of surrender charges
+        av_pp += inv_income_pp # before premium of the next month
+
+        inv_income = inv_income_pp @ (pols_if_next + 0.5 * (pols_death + pols_lapse))
+        av_change = av_pp @ pols_if_next - av_at_bef_mat
+        net_cf = (np.sum(savings.premiums(t)) + inv_income - claims - np.sum(savings.expenses(t))
+                  - np.sum(savings.commissions(t)) - av_change)
+        pv += net_cf * savings.disc_rate_arr[t]
+    return pv
+
+
+def pv_net_cf(scen_size=SCEN_SIZE, batch_size=None, **inputs):
+    """Total PV of net cash flows over the model points, by scenario.
+
+    ``inputs`` are those of the recursive model. Scenarios are projected
+    ``batch_size`` at a time, by default as many as keep ``BATCH_ELEMENTS``
+    account values per step, so memory stays flat and time grows linearly
+    with ``scen_size``.
+    """
+    inv_return = inv_return_scen(scen_size)
+    savings.use({**inputs, "scen_size": 1})
+    batch_size = batch_size or max(1, BATCH_ELEMENTS // len(inputs["model_point_table_ext"]))
+    return np.concatenate([
+        project_batch(inv_return[start:start + batch_size])
+        for start in range(0, scen_size, batch_size)
+    ])
+
+
+def run(inputs):
+    """Mean over the scenarios of the total PV of net cash flows."""
+    return float(np.mean(pv_net_cf(**inputs)))
+
+
+def savings_me_scenarios_numpy():
+    return run(load())
+
+if __name__ == "__main__":
+    print(savings_me_scenarios_numpy())
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+import os
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+from multiprocessing import get_context, shared_memory
+from pprint import pprint
+from types import SimpleNamespace
+
+from harness import summarise
+
+
+class SharedColumns:
+    """Model-point columns copied once into shared memory.
+
+    Workers attach to the blocks by name, so a task only pickles the bounds of
+    its shard. String columns are stored as fixed-width unicode arrays.
+    """
+    def __init__(self, columns):
+        self.blocks = {}
+        self.specs = {}
+        for name, values in columns.items():
+            values = np.ascontiguousarray(values if values.dtype != object else values.astype(str))
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, values.dtype, buffer=block.buf)[...] = values
+            self.blocks[name] = block
+            self.specs[name] = (block.name, values.shape, values.dtype.str)
+        self.size = len(next(iter(columns.values())))
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+
+
+def basic_term_m_split(inputs):
+    columns = {name: inputs[name] for name in ["sum_assured", "policy_term", "age_at_entry"]}
+    return {name: value for name, value in inputs.items() if name not in columns}, columns
+
+def basic_term_m_shard(assumptions, shard):
+    return {**assumptions, **shard}
+
+def basic_term_me_split(inputs):
+    names = ["premium_pp", "duration_mth", "age_at_entry", "sum_assured", "policy_count", "policy_term"]
+    return {"assume": inputs["assume"]}, {name: getattr(inputs["mp"], name) for name in names}
+
+def basic_term_me_shard(assumptions, shard):
+    return {**assumptions, "mp": SimpleNamespace(**shard)} # the formulas only read these columns of mp
+
+def savings_me_split(inputs):
+    table = inputs["model_point_table_ext"]
+    assumptions = {name: value for name, value in inputs.items() if name not in ("model_point_table", "model_point_table_ext")}
+    return assumptions, {name: table[name].to_numpy() for name in table.columns}
+
+def savings_me_shard(assumptions, shard):
+    return {**assumptions, "model_point_table_ext": pd.DataFrame(shard)}
+
+# model name: (module, split of the inputs into assumptions and model-point columns, inputs of one shard)
+MODELS = {
+    "basic_term_m": ("basicterm_m_array_numpy", basic_term_m_split, basic_term_m_shard),
+    "basic_term_me": ("basicterm_me_recursive_numpy", basic_term_me_split, basic_term_me_shard),
+    "savings_me": ("savings_me_recursive_numpy", savings_me_split, savings_me_shard),
+}
+
+_worker = {}
+
+def _attach(model, assumptions, specs):
+    """Worker initializer: import the model and map the shared columns.
+
+    The assumptions come from the parent, so workers do not read any data.
+    """
+    blocks = {name: shared_memory.SharedMemory(name=block_name) for name, (block_name, _, _) in specs.items()}
+    module, _, shard_inputs = MODELS[model]
+    _worker["blocks"] = blocks # keep the blocks open while the arrays use them
+    _worker["columns"] = {
+        name: np.ndarray(shape, dtype, buffer=blocks[name].buf) for name, (_, shape, dtype) in specs.items()
+    }
+    _worker["module"] = module = import_module(module)
+    _worker["assumptions"] = assumptions
+    _worker["shard_inputs"] = shard_inputs
+
+def _run_shard(bounds):
+    start, stop = bounds
+    shard = {name: values[start:stop] for name, values in _worker["columns"].items()}
+    return float(_worker["module"].run(_worker["shard_inputs"](_worker["assumptions"], shard)))
+
+def shard_bounds(size, shards):
+    edges = np.linspace(0, size, min(shards, size) + 1).astype(int)
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+class ShardedRun:
+    """Process pool that values one model's model points in shards.
+
+    The model-point table is placed in shared memory when the pool starts, and
+    each call returns the total PV of net cash flows as the serial model would.
+    Shard totals are added in shard order, so the result is reproducible but
+    can differ from the serial run in the last bits. Workers are spawned
+    rather than forked, as forking a process that already runs Numba, BLAS or
+    PyTorch thread pools can deadlock the workers.
+    """
+    def __init__(self, model, workers):
+        module, split, _ = MODELS[model]
+        self.workers = workers
+        assumptions, columns = split(import_module(module).load())
+        self.columns = SharedColumns(columns)
+        self.pool = ProcessPoolExecutor(
+            workers, mp_context=get_context("spawn"), initializer=_attach,
+            initargs=(model, assumptions, self.columns.specs))
+
+    def __call__(self, shards=None):
+        bounds = shard_bounds(self.columns.size, shards or self.workers)
+        return float(sum(self.pool.map(_run_shard, bounds)))
+
+    def close(self):
+        self.pool.shutdown()
+        self.columns.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def scaling(model, workers=None, trials=5):
+    """Run-time statistics by worker count, and the speedup of the minimum over the first (by default 1) worker."""
+    cpus = os.cpu_count() or 1
+    workers = workers or sorted({1, *(n for n in (2, 4, 8) if n < cpus), cpus})
+    results = {}
+    for n in workers:
+        with ShardedRun(model, n) as run:
+            result = run() # warm-up starts the workers
+            results[n] = {"result": result, **summarise(timeit.repeat(run, number=1, repeat=trials))}
+    fastest = results[workers[0]]["minimum time ms"]
+    for stats in results.values():
+        stats["speedup"] = fastest / stats["minimum time ms"]
+    return results
+
+
+def run_sharded_benchmarks():
+    benchmarks = {
+        "Python sharded array numpy basic_term_m": "basic_term_m",
+        "Python sharded recursive numpy basic_term_me": "basic_term_me",
+        "Python sharded recursive numpy cashvalue_me_ex4": "savings_me",
+    }
+    return {
+        f"{name} {n} workers": stats
+        for name, model in benchmarks.items()
+        for n, stats in scaling(model).items()
+    }
+
+if __name__ == "__main__":
+    results = run_sharded_benchmarks()
+    pprint(results)
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import resource
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from copy import copy
+from importlib import import_module
+from multiprocessing import get_context
+from harness import timed
+
+MULTIPLIERS = (1, 10, 100, 1000)
+
+
+def tile_array(values, multiplier):
+    if isinstance(values, np.ndarray):
+        return np.tile(values, multiplier)
+    return values.repeat(multiplier) # torch tensors repeat like np.tile
+
+def tile_table(table, multiplier):
+    tiled = pd.concat([table] * multiplier, ignore_index=True)
+    tiled.index = pd.RangeIndex(1, len(tiled) + 1, name=table.index.name)
+    return tiled
+
+def tile_arrays(inputs, multiplier, names):
+    """Inputs with the model-point arrays ``names`` tiled, and the tiled policy count."""
+    tiled = {**inputs, **{name: tile_array(inputs[name], multiplier) for name in names}}
+    return tiled, len(tiled[names[0]])
+
+def tile_model_points(mp, multiplier):
+    mp = copy(mp)
+    for name in ["premium_pp", "duration_mth", "age_at_entry", "sum_assured", "policy_count", "policy_term"]:
+        setattr(mp, name, tile_array(getattr(mp, name), multiplier))
+    return mp
+
+def tile_array_model(inputs, multiplier):
+    return tile_arrays(inputs, multiplier, ["sum_assured", "policy_term", "age_at_entry"])
+
+def tile_recursive_m(inputs, multiplier):
+    return tile_arrays(inputs, multiplier, ["sum_assured", "issue_age", "policy_term"])
+
+def tile_recursive_me(inputs, multiplier):
+    mp = tile_model_points(inputs["mp"], multiplier)
+    return {**inputs, "mp": mp}, len(mp.sum_assured)
+
+def tile_heavylight(model, multiplier):
+    mp = tile_model_points(model.mp, multiplier)
+    return type(model)(mp, model.assume), len(mp.sum_assured)
+
+def tile_savings(inputs, multiplier):
+    table = tile_table(inputs["model_point_table_ext"], multiplier)
+    return {**inputs, "model_point_table_ext": table}, len(table)
+
+def tile_lifelib(m, multiplier):
+    m.Projection.model_point_table = tile_table(m.Projection.model_point_table, multiplier)
+    return m, len(m.Projection.model_point_table)
+
+# implementation: (module, tile(inputs, multiplier), months projected once run(inputs) ran)
+IMPLEMENTATIONS = {
+    "Python lifelib basic_term_m": ("basicterm_m_lifelib", tile_lifelib, lambda model, m: m.Projection.max_proj_len()),
+    "Python recursive pytorch basic_term_m": ("basicterm_m_recursive_pytorch", tile_recursive_m, lambda model, inputs: model.max_proj_len),
+    "Python recursive numpy basic_term_m": ("basicterm_m_recursive_numpy", tile_recursive_m, lambda model, inputs: model.max_proj_len),
+    "Python array pytorch basic_term_m": ("basicterm_m_array_pytorch", tile_array_model, lambda model, inputs: inputs["max_proj_len"]),
+    "Python array numpy basic_term_m": ("basicterm_m_array_numpy", tile_array_model, lambda model, inputs: inputs["max_proj_len"]),
+    "Python lifelib basic_term_me": ("basicterm_me_lifelib", tile_lifelib, lambda model, m: m.Projection.max_proj_len()),
+    "Python recursive numpy basic_term_me": ("basicterm_me_recursive_numpy", tile_recursive_me, lambda model, inputs: model.max_proj_len()),
+    "Python iterative numpy basic_term_me": ("basicterm_me_iterative_numpy", tile_recursive_me, lambda model, inputs: model.max_proj_len(inputs["mp"])),
+    "Python heavylight numpy basic_term_me": ("basicterm_me_heavylight_numpy", tile_heavylight, lambda model, m: m.mp.max_proj_len),
+    "Python lifelib cashvalue_me_ex4": ("savings_me_lifelib", tile_lifelib, lambda model, m: m.Projection.max_proj_len()),
+    "Python recursive numpy cashvalue_me_ex4": ("savings_me_recursive_numpy", tile_savings, lambda model, inputs: model.max_proj_len()),
+}
+
+
+def sweep_point(implementation, multiplier, trials=3):
+    """Time one implementation on model points tiled ``multiplier`` times, in this process.
+
+    The peak RSS is the high-water mark of the process, so call this in a
+    fresh process for each point.
+    """
+    module, tile, months = IMPLEMENTATIONS[implementation]
+    model = import_module(module)
+    inputs, policies = tile(model.load(), multiplier)
+    model.run(inputs) # warm-up
+    seconds = min(timed(model.run, inputs)[1] for _ in range(trials))
+    policy_months = policies * int(months(model, inputs))
+    return {
+        "implementation": implementation,
+        "multiplier": multiplier,
+        "policies": policies,
+        "policy months": policy_months,
+        "time s": seconds,
+        "peak rss MB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "policy months per s": policy_months / seconds,
+    }
+
+
+def sweep(implementations=None, multipliers=MULTIPLIERS, trials=3, max_seconds=60.0):
+    """Scaling dataset of every implementation over the model-point ``multipliers``.
+
+    Each point runs in a fresh spawned process. An implementation stops at the
+    first multiplier that fails, e.g. runs out of memory, or whose runs take
+    longer than ``max_seconds``.
+    """
+    rows = []
+    for implementation in implementations or IMPLEMENTATIONS:
+        for multiplier in multipliers:
+            try:
+                with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                    row = pool.submit(sweep_point, implementation, multiplier, trials).result()
+            except (BrokenProcessPool, MemoryError) as exc:
+                print(f"{implementation} x{multiplier} failed: {exc!r}", file=sys.stderr)
+                break
+            rows.append(row)
+            if row["time s"] > max_seconds:
+                break
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    results = sweep()
+    results.to_csv("sweep_results.csv", index=False)
+    print(results.to_string(index=False))
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+PYTHON_DIR = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, PYTHON_DIR)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def model_dir():
+    """The models read their inputs relative to the Python benchmark directory."""
+    cwd = os.getcwd()
+    os.chdir(PYTHON_DIR)
+    yield
+    os.chdir(cwd)
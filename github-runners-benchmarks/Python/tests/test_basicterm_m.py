@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+import basicterm_m_array_numpy as array
+import basicterm_m_recursive_numpy as recursive
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    return array.load()
+
+
+def test_array_matches_recursive(inputs):
+    assert array.run(inputs) == pytest.approx(recursive.run(recursive.load()), rel=1e-12)
+
+
+def test_fused_numba_matches_array(inputs):
+    numba_model = pytest.importorskip("basicterm_m_fused_numba", exc_type=ImportError)
+    np.testing.assert_allclose(numba_model.project(**inputs), array.project(**inputs)["pv_net_cf"], rtol=1e-10, atol=1e-6)
+
+
+@pytest.mark.parametrize("chunk_size", [1000, 3000, 10_000])
+def test_chunked_matches_run(inputs, chunk_size):
+    assumptions = array.load_assumptions()
+    totals = array.run_chunked(chunks=array.model_point_chunks(chunk_size=chunk_size), **assumptions)
+    assert totals["n_policies"] == len(inputs["sum_assured"])
+    assert totals["pv_net_cf"] == pytest.approx(array.run(inputs), rel=1e-12)
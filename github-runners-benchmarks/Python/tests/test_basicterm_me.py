@@ -0,0 +1,53 @@
+import ast
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import basicterm_me_iterative_numpy as iterative
+import basicterm_me_recursive_numpy as recursive
+
+CONTAINER_COPY = os.path.join(os.path.dirname(__file__), "..", "..", "..", "containers", "BasicTerm_ME_python", "term_me_iterative_numpy.py")
+COPIED = {"CASHFLOWS", "EXPENSE_ACQ", "EXPENSE_MAINT", "INFLATION_RATE", "max_proj_len", "project"}
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    return recursive.load()
+
+
+@pytest.fixture(scope="module")
+def recursive_result_cf(inputs):
+    recursive.run(inputs)
+    return recursive.result_cf()
+
+
+def test_iterative_cashflows_match_recursive(inputs, recursive_result_cf):
+    pd.testing.assert_frame_equal(iterative.result_cf(inputs), recursive_result_cf, check_index_type=False, rtol=1e-10)
+
+
+def test_iterative_run_matches_recursive(inputs):
+    assert iterative.run(inputs) == pytest.approx(recursive.run(inputs), rel=1e-12)
+
+
+def test_fused_numba_matches_recursive(inputs):
+    numba_model = pytest.importorskip("basicterm_me_fused_numba", exc_type=ImportError)
+    recursive.run(inputs)
+    np.testing.assert_allclose(numba_model.project(**inputs), recursive.pv_net_cf(), rtol=1e-10, atol=1e-6)
+
+
+def copied_definitions(path):
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    definitions = {}
+    for node in tree.body:
+        names = [target.id for target in node.targets] if isinstance(node, ast.Assign) else [getattr(node, "name", None)]
+        definitions.update({name: ast.dump(node) for name in names if name in COPIED})
+    return definitions
+
+
+def test_container_kernel_is_in_sync():
+    copied = copied_definitions(CONTAINER_COPY)
+    assert sorted(copied) == sorted(COPIED)
+    assert copied == copied_definitions(iterative.__file__)
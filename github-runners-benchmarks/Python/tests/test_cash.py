@@ -0,0 +1,99 @@
+import pytest
+
+from cash import Cash, Recorder, _MISSING
+
+
+def make_model():
+    cash = Cash()
+
+    @cash(lookback=1)
+    def pols_if(t):
+        return 100.0 if t == 0 else pols_if(t - 1) * (1 - lapse_rate(t - 1))
+
+    @cash(lookback=0)
+    def lapse_rate(t):
+        return 0.01 * (t % 3 + 1)
+
+    @cash
+    def pv_pols_if():
+        return sum(pols_if(t) * 0.99 ** t for t in range(proj_len()))
+
+    @cash
+    def proj_len():
+        return 50
+
+    return cash, pols_if, pv_pols_if
+
+
+def kept(cash, name):
+    return [t for t, value in enumerate(cash.caches[name].rows.get(None, [])) if value is not _MISSING]
+
+
+@pytest.fixture
+def model():
+    return make_model()
+
+
+def test_sliding_keeps_lookback_entries(model):
+    cash, pols_if, pv_pols_if = model
+    expected = pv_pols_if()
+    cash.reset(sliding=True)
+    assert pv_pols_if() == expected
+    assert kept(cash, "pols_if") == [48, 49]
+    assert kept(cash, "lapse_rate") == [48]
+
+
+def test_replay_matches_recursion(model):
+    cash, pols_if, pv_pols_if = model
+    expected = pv_pols_if()
+    assert cash.record(pv_pols_if) == expected
+    cash.reset()
+    cash.replay()
+    assert cash.caches["pv_pols_if"].scalar[0] == expected
+    assert len(kept(cash, "pols_if")) == 50
+
+
+@pytest.mark.parametrize("trace", ["profile", "record"])
+def test_traced_runs_evict_like_plain_runs(model, trace):
+    cash, pols_if, pv_pols_if = model
+    cash.reset(sliding=True)
+    expected = pv_pols_if()
+    plain = kept(cash, "pols_if"), kept(cash, "lapse_rate")
+    cash.reset(sliding=True)
+    if trace == "profile":
+        assert cash.profile(pv_pols_if) == expected
+    else: # record() resets to the plain mode, so trace the sliding run directly
+        cash.tracer = Recorder(cash)
+        try:
+            assert pv_pols_if() == expected
+        finally:
+            cash.tracer = None
+    assert (kept(cash, "pols_if"), kept(cash, "lapse_rate")) == plain
+
+
+def test_profile_counts_calls(model):
+    cash, pols_if, pv_pols_if = model
+    cash.reset()
+    cash.profile(pv_pols_if)
+    stats = cash.report()
+    assert stats["pols_if"]["misses"] == 50
+    assert stats["pols_if"]["calls"] == stats["pols_if"]["hits"] + stats["pols_if"]["misses"]
+    assert stats["lapse_rate"]["misses"] == 49
+    assert stats["pols_if"]["bytes"] > 0
+    assert 0 < stats["pv_pols_if"]["self time ms"] < 1000
+
+
+def test_variant_can_be_passed_by_its_name():
+    cash = Cash()
+
+    @cash
+    def pols_if_at(t, timing="BEF_MAT"):
+        return (t, timing)
+
+    assert pols_if_at(2, timing="BEF_DECR") == pols_if_at(2, "BEF_DECR") == (2, "BEF_DECR")
+    assert pols_if_at(t=2) == (2, "BEF_MAT")
+    assert cash.caches["pols_if_at"].get((2, "BEF_DECR"), {}) == (2, "BEF_DECR")
+    with pytest.raises(TypeError, match="unexpected keyword argument 'kind'"):
+        pols_if_at(2, kind="DEATH")
+    with pytest.raises(TypeError, match="multiple values for argument 'timing'"):
+        pols_if_at(2, "BEF_DECR", timing="BEF_MAT")
@@ -0,0 +1,25 @@
+import os
+
+import numpy as np
+
+import curves
+
+CONTAINER_COPY = os.path.join(os.path.dirname(__file__), "..", "..", "..", "containers", "BasicTerm_ME_python", "curves.py")
+
+
+def source_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()[1:] # the header comment names the other copy
+
+
+def test_container_copy_is_in_sync():
+    assert source_lines(curves.__file__) == source_lines(CONTAINER_COPY)
+
+
+def test_curve_is_shared_and_read_only():
+    rates = np.array([0.01, 0.02, 0.03])
+    curve = curves.curve(rates, 0.01, 40)
+    assert curves.curve(rates.copy(), 0.01, 40) is curve
+    assert not curve.discount.flags.writeable
+    t = np.arange(40)
+    np.testing.assert_allclose(curve.discount, (1 + rates[np.minimum(t // 12, 2)]) ** (-t / 12), rtol=1e-15)
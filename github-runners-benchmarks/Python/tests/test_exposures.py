@@ -0,0 +1,23 @@
+import pandas as pd
+import pytest
+
+import exposures
+
+
+@pytest.fixture(scope="module")
+def census():
+    return exposures.load()
+
+
+def test_policy_year_rows_match_r_and_julia(census):
+    assert exposures.run_num_rows(census) == 141281
+
+
+def test_one_day_final_period_is_a_full_period():
+    census = pd.DataFrame({
+        "pol_num": [1], "status": ["Death"],
+        "issue_date": pd.to_datetime(["2006-09-30"]), "term_date": pd.to_datetime(["2013-01-30"]),
+    })
+    exposed = exposures.expose_pm(census, exposures.STUDY_START, exposures.STUDY_END)
+    assert exposed["exposure"].iloc[-1] == 1.0
+    assert (exposed["exposure"] > 0).all()
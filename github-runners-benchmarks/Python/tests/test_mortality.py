@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import mortality
+
+EXPECTED = 1904.4865526636793
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return mortality.load()
+
+
+def pv_unit_claims_by_cell(select, ultimate, rate=0.02, horizon=30):
+    """The original ``mortality1`` projection, per (table, issue age, duration) cell."""
+    table, issue_age, duration = [x.ravel() for x in np.meshgrid(np.arange(10), np.arange(18, 51), np.arange(25), indexing="ij")]
+    duration_projected = np.arange(horizon)[:, None] + duration
+    q = np.where(
+        duration_projected < select.shape[-1],
+        select[table, issue_age - 18, np.minimum(duration_projected, select.shape[-1] - 1)],
+        ultimate[table, issue_age - 18 + duration_projected],
+    )
+    npx = np.concatenate([np.ones((1, q.shape[1])), np.cumprod(1 - q, axis=0)[:-1]], axis=0)
+    return ((1 + rate) ** -np.arange(1, horizon + 1)[:, None] * npx * q).sum(axis=0)
+
+
+def test_run(tables):
+    assert mortality.run(tables) == pytest.approx(EXPECTED, rel=1e-12)
+
+
+def test_basis_matches_original_projection(tables):
+    expected = pv_unit_claims_by_cell(tables["select"], tables["ultimate"])
+    basis = mortality.basis(tables["select"], tables["ultimate"])
+    np.testing.assert_allclose(basis.pv_unit_claims(0.02), expected, rtol=1e-12)
+
+
+def test_grid_slices_match_original_projection(tables):
+    grid = mortality.pv_unit_claims_grid(tables["select"], tables["ultimate"], rates=[0.02, 0.05], horizons=[10, 30])
+    assert len(grid) == 4 * 10 * 33 * 25
+    for rate in [0.02, 0.05]:
+        for horizon in [10, 30]:
+            expected = pv_unit_claims_by_cell(tables["select"], tables["ultimate"], rate, horizon)
+            np.testing.assert_allclose(grid.loc[(rate, horizon)].to_numpy(), expected, rtol=1e-12)
+    assert grid.loc[(0.02, 30)].sum() == pytest.approx(EXPECTED, rel=1e-12)
+
+
+def test_grid_rejects_horizons_past_the_ultimate_table(tables):
+    mortality.pv_unit_claims_grid(tables["select"], tables["ultimate"], rates=0.02, horizons=47)
+    with pytest.raises(ValueError, match="horizon must be between 1 and 47"):
+        mortality.pv_unit_claims_grid(tables["select"], tables["ultimate"], rates=0.02, horizons=[30, 48])
+    with pytest.raises(ValueError, match="horizon must be between"):
+        mortality.pv_unit_claims_grid(tables["select"], tables["ultimate"], rates=0.02, horizons=0)
+
+
+@pytest.mark.parametrize("rates, horizons", [([0.02, 0.02], [30]), ([0.02], [10, 10])])
+def test_grid_rejects_duplicates(tables, rates, horizons):
+    with pytest.raises(ValueError, match="must be distinct"):
+        mortality.pv_unit_claims_grid(tables["select"], tables["ultimate"], rates=rates, horizons=horizons)
@@ -0,0 +1,45 @@
+import importlib
+
+import pytest
+
+EXPECTED = {
+    "basicterm_m_recursive_numpy": 14489630.5346,
+    "basicterm_m_recursive_pytorch": 14489630.5346,
+    "basicterm_me_recursive_numpy": 215146132.068,
+    "savings_me_recursive_numpy": 3507113709040.12,
+}
+
+
+@pytest.fixture(scope="module", params=sorted(EXPECTED))
+def model(request):
+    if "pytorch" in request.param:
+        pytest.importorskip("torch")
+    module = importlib.import_module(request.param)
+    inputs = module.load()
+    return module, inputs, module.run(inputs)
+
+
+def test_run(model):
+    module, inputs, result = model
+    assert result == pytest.approx(EXPECTED[module.__name__], rel=1e-11)
+
+
+@pytest.mark.parametrize("mode", ["run_sliding", "run_replay"])
+def test_modes_match_run(model, mode):
+    module, inputs, result = model
+    assert getattr(module, mode)(inputs) == pytest.approx(result, rel=1e-14)
+    assert getattr(module, mode)(inputs) == pytest.approx(result, rel=1e-14) # replay reuses its schedule
+
+
+def test_profile_matches_run(model):
+    module, inputs, result = model
+    assert module.cash.profile(module.run, inputs) == pytest.approx(result, rel=1e-14)
+    assert module.cash.report()
+
+
+def test_sliding_holds_less_than_full_cache(model):
+    module, inputs, _ = model
+    module.run(inputs)
+    full = module.cash.nbytes()
+    module.run_sliding(inputs)
+    assert module.cash.nbytes() < full / 2
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+import savings_me_recursive_numpy as savings
+
+EXPECTED = 3507113709040.12
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    return savings.load()
+
+
+def test_run(inputs):
+    assert savings.run(inputs) == pytest.approx(EXPECTED, rel=1e-12)
+
+
+def test_surr_charge_rate_matrix_matches_gather(inputs):
+    savings.run(inputs)
+    matrix = savings.surr_charge_rate_matrix()
+    assert matrix is not None
+    duration_cap = savings.surr_charge_max_idx()
+    for t in [0, 1, 12, 119, savings.max_proj_len() - 1]:
+        gathered = savings.surr_charge_rates()[
+            savings.model_point().surr_charge_id, np.minimum(savings.duration(t), duration_cap)]
+        assert (gathered == matrix[t]).all()
+
+
+def test_sliding_skips_surr_charge_rate_matrix(inputs):
+    assert savings.run_sliding(inputs) == pytest.approx(EXPECTED, rel=1e-12)
+    assert savings.surr_charge_rate_matrix() is None
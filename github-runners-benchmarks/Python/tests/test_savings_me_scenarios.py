@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import savings_me_recursive_numpy as savings
+import savings_me_scenarios_numpy as scenarios
+
+SCEN_SIZE = 3
+
+# the formulas as commented out in the recursive model, so every decrement and charge applies
+DECREMENTS = {
+    "mort_rate": lambda t: np.full(savings.model_point().size, 0.01),
+    "lapse_rate": lambda t: 0.05,
+    "coi_rate": lambda t: 1.1 * savings.mort_rate_mth(t),
+    "maint_fee_rate": lambda: 0.01 / 12,
+}
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    return scenarios.load(scen_size=SCEN_SIZE)
+
+
+def recursive_by_scenario(inputs):
+    savings.run(inputs)
+    scen_id = savings.model_point().index.get_level_values("scen_id")
+    pv = savings.pv_net_cf()
+    savings.use({"scen_size": 1})
+    return np.bincount(scen_id - 1, weights=pv)
+
+
+def use_decrements(monkeypatch):
+    for name, formula in DECREMENTS.items():
+        formula.__name__ = name
+        monkeypatch.setitem(savings.cash.caches, name, savings.cash.caches[name])
+        monkeypatch.setattr(savings, name, savings.cash(formula, lookback=None if name == "maint_fee_rate" else 0))
+    savings.cash.reset()
+
+
+def test_scenarios_match_recursive_model(inputs):
+    np.testing.assert_allclose(scenarios.pv_net_cf(**inputs), recursive_by_scenario(inputs), rtol=1e-12)
+
+
+def test_decrements_match_recursive_model(inputs, monkeypatch):
+    without = scenarios.pv_net_cf(**inputs)
+    use_decrements(monkeypatch)
+    expected = recursive_by_scenario(inputs)
+    assert not np.allclose(expected, without, rtol=1e-3)
+    np.testing.assert_allclose(scenarios.pv_net_cf(**inputs), expected, rtol=1e-12)
+    monkeypatch.undo()
+    savings.cash.reset()
+
+
+def test_batches_do_not_change_the_result(inputs):
+    whole = scenarios.pv_net_cf(**inputs, batch_size=SCEN_SIZE)
+    np.testing.assert_allclose(scenarios.pv_net_cf(**inputs, batch_size=2), whole, rtol=1e-12)
+
+
+def test_first_scenario_does_not_depend_on_scen_size(inputs):
+    first = scenarios.run({**inputs, "scen_size": 1})
+    assert scenarios.pv_net_cf(**inputs)[0] == pytest.approx(first, rel=1e-14)
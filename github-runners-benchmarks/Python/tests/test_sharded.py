@@ -0,0 +1,47 @@
+import importlib
+
+import pytest
+
+import sharded
+from sharded import MODELS, SharedColumns, ShardedRun, scaling, shard_bounds
+
+
+def test_shard_bounds_cover_every_row():
+    bounds = shard_bounds(10, 3)
+    assert bounds[0][0] == 0 and bounds[-1][1] == 10
+    assert all(stop == start for (_, stop), (start, _) in zip(bounds, bounds[1:]))
+    assert shard_bounds(2, 4) == [(0, 1), (1, 2)]
+
+
+@pytest.mark.parametrize("model", sorted(MODELS))
+def test_sharded_matches_serial(model):
+    module = importlib.import_module(MODELS[model][0])
+    serial = module.run(module.load())
+    with ShardedRun(model, workers=2) as run:
+        assert run() == pytest.approx(serial, rel=1e-12)
+        assert run(shards=5) == pytest.approx(serial, rel=1e-12)
+
+
+def test_workers_take_the_assumptions_from_the_parent(monkeypatch):
+    module_name, split, _ = MODELS["basic_term_m"]
+    module = importlib.import_module(module_name)
+    serial = module.run(module.load())
+    assumptions, columns = split(module.load())
+    shared = SharedColumns(columns)
+    monkeypatch.setattr(module, "load", lambda *args: pytest.fail("a worker loaded the model points"))
+    try:
+        sharded._attach("basic_term_m", assumptions, shared.specs)
+        assert sharded._run_shard((0, shared.size)) == pytest.approx(serial, rel=1e-12)
+    finally:
+        blocks = sharded._worker.pop("blocks", {})
+        sharded._worker.clear() # drop the arrays before closing the blocks they map
+        for block in blocks.values():
+            block.close()
+        shared.close()
+
+
+def test_scaling_reports_milliseconds():
+    results = scaling("basic_term_m", workers=[1, 2], trials=2)
+    assert sorted(results) == [1, 2]
+    assert results[1]["speedup"] == 1.0
+    assert all(isinstance(stats["minimum time ms"], float) and stats["minimum time ms"] > 0 for stats in results.values())
@@ -0,0 +1,25 @@
+import os
+import shutil
+
+import pandas as pd
+
+import xlsx_cache
+
+CONTAINER_COPY = os.path.join(os.path.dirname(__file__), "..", "..", "..", "containers", "BasicTerm_ME_python", "xlsx_cache.py")
+
+
+def source_lines(path):
+    with open(path) as f:
+        return f.read().splitlines()[1:] # the header comment names the other copy
+
+
+def test_container_copy_is_in_sync():
+    assert source_lines(xlsx_cache.__file__) == source_lines(CONTAINER_COPY)
+
+
+def test_cached_frame_matches_workbook(tmp_path):
+    path = shutil.copy(os.path.join("BasicTerm_ME", "premium_table.xlsx"), tmp_path)
+    expected = pd.read_excel(path, index_col=[0, 1])
+    for _ in range(2): # parse and store, then memory-map
+        pd.testing.assert_frame_equal(xlsx_cache.read_excel(path, index_col=[0, 1]), expected)
+    assert os.listdir(tmp_path / xlsx_cache.CACHE_DIR)
@@ -0,0 +1,80 @@
+# Kept in sync with containers/BasicTerm_ME_python/xlsx_cache.py, a copy for the Docker build context.
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = "_xlsx_cache"
+
+
+def source_hash(path, **kwargs):
+    """Hash of the workbook bytes and the options it is read with."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(json.dumps(kwargs, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def write_frame(frame, directory):
+    """Store the index levels and columns of ``frame`` as one ``.npy`` file each.
+
+    A default ``RangeIndex`` is not stored. String columns are stored as
+    fixed-width unicode so every file can be memory-mapped.
+    """
+    if isinstance(frame.index, pd.RangeIndex) and frame.index.name is None:
+        levels = []
+    else:
+        levels = [frame.index.get_level_values(i).to_numpy() for i in range(frame.index.nlevels)]
+    arrays = levels + [frame.iloc[:, i].to_numpy() for i in range(frame.shape[1])]
+    meta = {
+        "index": list(frame.index.names) if levels else [],
+        "columns": list(frame.columns),
+    }
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent)
+    for i, values in enumerate(arrays):
+        np.save(os.path.join(staging, f"{i}.npy"), values.astype(str) if values.dtype == object else values)
+    with open(os.path.join(staging, "columns.json"), "w") as f:
+        json.dump(meta, f)
+    try:
+        os.replace(staging, directory)
+    except OSError: # another process stored the same workbook first
+        for name in os.listdir(staging):
+            os.remove(os.path.join(staging, name))
+        os.rmdir(staging)
+
+
+def read_frame(directory):
+    with open(os.path.join(directory, "columns.json")) as f:
+        meta = json.load(f)
+    n_index = len(meta["index"])
+    arrays = []
+    for i in range(n_index + len(meta["columns"])):
+        values = np.load(os.path.join(directory, f"{i}.npy"), mmap_mode="r")
+        arrays.append(values.astype(object) if values.dtype.kind == "U" else values)
+    if n_index == 0:
+        index = None
+    elif n_index == 1:
+        index = pd.Index(arrays[0], name=meta["index"][0])
+    else:
+        index = pd.MultiIndex.from_arrays(arrays[:n_index], names=meta["index"])
+    return pd.DataFrame(dict(zip(meta["columns"], arrays[n_index:])), index=index)
+
+
+def read_excel(path, **kwargs):
+    """``pd.read_excel`` that parses each workbook only once.
+
+    The first read stores the sheet under ``_xlsx_cache`` next to the workbook,
+    keyed by ``source_hash``, and later reads load the memory-mapped columns
+    from there. Editing the workbook changes the hash, so it is parsed again.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    directory = os.path.join(os.path.dirname(path), CACHE_DIR, f"{name}-{source_hash(path, **kwargs)}")
+    if not os.path.exists(os.path.join(directory, "columns.json")):
+        write_frame(pd.read_excel(path, **kwargs), directory)
+    return read_frame(directory)
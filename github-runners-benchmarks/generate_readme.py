@@ -1,4 +1,5 @@
 import yaml
+from history import append_results, render_trends
 
 def read_yaml_file(filename):
     with open(filename, 'r') as stream:
@@ -12,11 +13,16 @@ def generate_readme():
     python_yaml = read_yaml_file('Python/benchmark_results.yaml')
     r_yaml = read_yaml_file('R/benchmark_results.yaml')
     final_result = {}
+    machines = {}
     for d in (julia_yaml, python_yaml, r_yaml):
+        machine = d.pop('machine', 'unknown') # fingerprint stamped by the benchmark job
         for k, v in d.items():
             if k not in final_result:
                 final_result[k] = []
             final_result[k].append(v)
+            machines.update({implementation: machine for implementation in v})
+
+    history = append_results(final_result, machines)
 
     # read the text in readme_template.md and store it as a string "template"
     with open('readme_template.md', 'r') as f:
@@ -24,6 +30,8 @@ def generate_readme():
 
     with open('README.md', 'w') as readme:
         readme.write(template)
+        readme.write('\n\n')
+        readme.write(render_trends(history))
         readme.write('\n\n```yaml \n')
         readme.write(yaml.dump(final_result, allow_unicode=True))
         readme.write('```\n')
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+HISTORY_FILE = "benchmark_history.jsonl"
+# run time of each model (R and Julia only report the minimum), and the memory the Python harness records
+TRACKED_METRICS = ["minimum time ms", "median time ms", "peak rss MB", "tracemalloc peak bytes", "cache bytes"]
+UNIT_MS = {"ns": 1e-6, "μs": 1e-3, "us": 1e-3, "ms": 1.0, "milliseconds": 1.0, "s": 1e3, "seconds": 1e3}
+ALIASES = {"min": "minimum time"} # R reports its minimum as "min"
+DURATION = re.compile(r"(\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\s*(ns|μs|us|ms|milliseconds|seconds|s)\b")
+
+
+def commit():
+    if "GITHUB_SHA" in os.environ:
+        return os.environ["GITHUB_SHA"]
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            return next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), "")
+    except OSError:
+        return platform.processor()
+
+
+def machine_fingerprint():
+    """Short hash of the machine this process runs on.
+
+    The GitHub-hosted runners share an image, so its name is part of the hash.
+    """
+    parts = [platform.system(), platform.machine(), cpu_model(), str(os.cpu_count()), os.environ.get("ImageOS", "")]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:12]
+
+
+def stamp_machine(path):
+    """Append the fingerprint of this machine to the benchmark results in ``path``.
+
+    Run by each benchmark job, so the fingerprint describes the runner that
+    produced the results rather than the one that generates the README.
+    """
+    with open(path, "a") as f:
+        f.write(f'\nmachine: "{machine_fingerprint()}"\n')
+
+
+def metric_values(results):
+    """Numeric metrics of one implementation's results.
+
+    Numbers are kept as they are. Duration strings such as ``"TrialEstimate(29.152 ms)"``
+    or ``"470.4 ms"`` become ``"<key> ms"``, and anything else is skipped.
+    """
+    metrics = {}
+    for key, value in results.items():
+        key = ALIASES.get(key, key)
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            metrics[key] = float(value)
+        elif isinstance(value, str):
+            match = DURATION.search(value)
+            if match:
+                metrics[key if key.endswith(" ms") else f"{key} ms"] = float(match.group(1)) * UNIT_MS[match.group(2)]
+            else:
+                try:
+                    metrics[key] = float(value)
+                except ValueError:
+                    pass
+    return metrics
+
+
+def append_results(final_result, machines, path=HISTORY_FILE):
+    """Append one record per benchmark and implementation of ``final_result`` to ``path``.
+
+    ``final_result`` maps each benchmark to the list of per-language result
+    dicts that ``generate_readme`` collects, and ``machines`` maps each
+    implementation to the fingerprint its job recorded. Returns the whole history.
+    """
+    stamp = {
+        "commit": commit(),
+        "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    with open(path, "a") as f:
+        for benchmark, languages in final_result.items():
+            for language in languages:
+                for implementation, results in language.items():
+                    if not isinstance(results, dict):
+                        continue
+                    record = {**stamp, "machine": machines.get(implementation, "unknown"), "benchmark": benchmark, "implementation": implementation,
+                              "metrics": metric_values(results)}
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return load_history(path)
+
+
+def load_history(path=HISTORY_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def series(history):
+    """Records grouped by machine, benchmark and implementation, oldest first."""
+    grouped = {}
+    for record in history:
+        grouped.setdefault((record["machine"], record["benchmark"], record["implementation"]), []).append(record)
+    return grouped
+
+
+def find_regressions(history, window=10, z=3.0, min_change=0.05, min_baseline=3):
+    """Metrics of the latest record of each series that rose significantly.
+
+    The baseline is the previous ``window`` records on the same machine. A
+    metric is flagged when it exceeds the baseline mean by more than ``z``
+    standard deviations and by more than ``min_change`` relative to the mean.
+    """
+    regressions = []
+    for (machine, benchmark, implementation), records in series(history).items():
+        latest, baseline = records[-1], records[-window - 1:-1]
+        for metric in TRACKED_METRICS:
+            values = [r["metrics"][metric] for r in baseline if metric in r["metrics"]]
+            if metric not in latest["metrics"] or len(values) < min_baseline:
+                continue
+            value, mean, stdev = latest["metrics"][metric], statistics.mean(values), statistics.stdev(values)
+            if value > mean * (1 + min_change) and value > mean + z * stdev:
+                regressions.append({
+                    "benchmark": benchmark,
+                    "implementation": implementation,
+                    "metric": metric,
+                    "value": value,
+                    "baseline mean": mean,
+                    "baseline stdev": stdev,
+                    "commit": latest["commit"],
+                })
+    return regressions
+
+
+def render_trends(history, metric="minimum time ms", last=5):
+    """Markdown tables of ``metric`` over the last runs, and any flagged regressions."""
+    lines = ["## Trends", ""]
+    grouped = series(history)
+    for benchmark in sorted({key[1] for key in grouped}):
+        lines += [f"### {benchmark}", "", f"| implementation | {metric} (last {last} runs, oldest first) | change |", "|-|-|-|"]
+        for (machine, bench, implementation), records in sorted(grouped.items()):
+            values = [r["metrics"][metric] for r in records[-last:] if metric in r["metrics"]]
+            if bench != benchmark or not values:
+                continue
+            change = f"{(values[-1] / values[0] - 1) * 100:+.1f}%" if len(values) > 1 and values[0] else ""
+            lines.append(f"| {implementation} | {' → '.join(f'{v:.4g}' for v in values)} | {change} |")
+        lines.append("")
+    regressions = find_regressions(history)
+    if regressions:
+        lines += ["### Regressions", "", "| benchmark | implementation | metric | latest | baseline mean |", "|-|-|-|-|-|"]
+        for r in regressions:
+            lines.append(f"| {r['benchmark']} | {r['implementation']} | {r['metric']} | {r['value']:.4g} | {r['baseline mean']:.4g} |")
+        lines.append("")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    stamp_machine(sys.argv[1])
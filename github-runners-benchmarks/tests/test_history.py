@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from history import append_results, find_regressions, load_history, metric_values, stamp_machine
+
+
+def results(minimum, stddev=1.0, cache_bytes=4_000_000):
+    return {"basic_term_benchmark": [{"Python recursive numpy basic_term_m": {
+        "minimum time ms": minimum, "median time ms": minimum, "stddev time ms": stddev, "result": 14489630.5346,
+        "peak rss MB": 180.0, "tracemalloc peak bytes": 2 * cache_bytes, "cache bytes": cache_bytes,
+    }}]}
+
+
+def history(path, minimums, stddevs=None, machine="a", cache_bytes=None):
+    stddevs = stddevs or [1.0] * len(minimums)
+    cache_bytes = cache_bytes or [4_000_000] * len(minimums)
+    for minimum, stddev, held in zip(minimums, stddevs, cache_bytes):
+        append_results(results(minimum, stddev, held), {"Python recursive numpy basic_term_m": machine}, path)
+    return load_history(path)
+
+
+def test_metric_values_parses_durations():
+    julia = metric_values({"minimum time": "TrialEstimate(239.946 μs)", "num_rows": 141281})
+    r = metric_values({"min": "470.446116 ms"})
+    assert julia == {"minimum time ms": pytest.approx(0.239946), "num_rows": 141281}
+    assert r == {"minimum time ms": pytest.approx(470.446116)}
+
+
+def test_slower_run_is_flagged(tmp_path):
+    regressions = find_regressions(history(tmp_path / "h.jsonl", [50, 51, 49, 50, 50.5, 80]))
+    assert {r["metric"] for r in regressions} == {"minimum time ms", "median time ms"}
+
+
+def test_memory_jump_is_flagged(tmp_path):
+    h = history(tmp_path / "h.jsonl", [50] * 6, cache_bytes=[4_000_000] * 5 + [9_000_000])
+    assert {r["metric"] for r in find_regressions(h)} == {"tracemalloc peak bytes", "cache bytes"}
+
+
+def test_steady_run_is_not_flagged(tmp_path):
+    assert find_regressions(history(tmp_path / "h.jsonl", [50, 51, 49, 50, 50.5, 50.2])) == []
+
+
+def test_untracked_metrics_are_not_flagged(tmp_path):
+    h = history(tmp_path / "h.jsonl", [50] * 6, stddevs=[1.0, 1.1, 0.9, 1.0, 1.05, 10.0])
+    assert find_regressions(h) == []
+
+
+def test_baseline_is_per_machine(tmp_path):
+    path = tmp_path / "h.jsonl"
+    history(path, [50, 51, 49, 50, 50.5], machine="a")
+    assert find_regressions(history(path, [80], machine="b")) == []
+
+
+def test_stamped_machine_is_read_back(tmp_path):
+    import yaml
+    path = tmp_path / "benchmark_results.yaml"
+    path.write_text(yaml.dump(results(50)["basic_term_benchmark"][0]))
+    stamp_machine(path)
+    stamped = yaml.safe_load(path.read_text())
+    assert isinstance(stamped["machine"], str) and len(stamped["machine"]) == 12